@@ -1,6 +1,6 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
-# Copyright (c) 2014-18 Richard Hull and contributors
+# Copyright (c) 2014-2026 Richard Hull and contributors
 # See LICENSE.rst for details.
 # PYTHON_ARGCOMPLETE_OK
 
@@ -9,77 +9,183 @@ Rotating 3D box wireframe & color dithering.
 
 Adapted from:
 http://codentronix.com/2011/05/12/rotating-3d-cube-using-python-and-pygame/
+
+Other meshes can be spun instead of the box by setting ``MESH`` to "torus",
+or to the path of a (simple) Wavefront OBJ file. Each frame, the vertices
+are transformed with a single combined rotation & projection matrix, faces
+pointing away from the viewer are culled and the rest are drawn back to
+front.
 """
 
 import sys
 import math
-from operator import itemgetter
 from demo_opts import get_device
 from luma.core.render import canvas
 from luma.core.sprite_system import framerate_regulator
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+# "box", "torus" or the path to an OBJ file
+MESH = "box"
+
+# Use the NumPy renderer when numpy is installed
+USE_NUMPY = True
+
+FOV = 256
+
+# Colour of meshes which don't specify colours for their faces, which are
+# shaded according to how much they face the viewer instead
+BASE_COLOR = (255, 160, 32)
+
 
 def radians(degrees):
     return degrees * math.pi / 180
 
 
-class point(object):
+def matmul(a, b):
+    return [[sum(a[i][k] * b[k][j] for k in range(len(b))) for j in range(len(b[0]))]
+            for i in range(len(a))]
 
-    def __init__(self, x, y, z):
-        self.coords = (x, y, z)
-        self.xy = (x, y)
-        self.z = z
 
-    def rotate_x(self, angle):
-        x, y, z = self.coords
-        rad = radians(angle)
-        c = math.cos(rad)
-        s = math.sin(rad)
-        return point(x, y * c - z * s, y * s + z * c)
+def rotation_matrix(a, b, c):
+    """
+    The 3x3 matrix which rotates by ``a`` degrees about the x axis, then ``b``
+    degrees about the y axis and then ``c`` degrees about the z axis.
+    """
+    ca, sa = math.cos(radians(a)), math.sin(radians(a))
+    cb, sb = math.cos(radians(b)), math.sin(radians(b))
+    cc, sc = math.cos(radians(c)), math.sin(radians(c))
+    rx = [[1, 0, 0], [0, ca, -sa], [0, sa, ca]]
+    ry = [[cb, 0, sb], [0, 1, 0], [-sb, 0, cb]]
+    rz = [[cc, -sc, 0], [sc, cc, 0], [0, 0, 1]]
+    return matmul(rz, matmul(ry, rx))
 
-    def rotate_y(self, angle):
-        x, y, z = self.coords
-        rad = radians(angle)
-        c = math.cos(rad)
-        s = math.sin(rad)
-        return point(z * s + x * c, y, z * c - x * s)
 
-    def rotate_z(self, angle):
-        x, y, z = self.coords
-        rad = radians(angle)
-        c = math.cos(rad)
-        s = math.sin(rad)
-        return point(x * c - y * s, x * s + y * c, z)
+def projection_matrix(rotation, size, fov, viewer_distance):
+    """
+    Combines a rotation with the perspective projection onto a screen of the
+    given size, as a 3x4 matrix. Applied to a vertex ``(x, y, z, 1)`` it
+    gives ``(sx * w, sy * w, w)``, where ``(sx, sy)`` is the position on the
+    screen and ``w`` is the distance from the viewer.
+    """
+    cx, cy = size[0] / 2, size[1] / 2
+    perspective = [
+        [fov, 0, cx, cx * viewer_distance],
+        [0, -fov, cy, cy * viewer_distance],
+        [0, 0, 1, viewer_distance]
+    ]
+    return matmul(perspective, [row + [0] for row in rotation] + [[0, 0, 0, 1]])
 
-    def project(self, size, fov, viewer_distance):
-        x, y, z = self.coords
-        factor = fov / (viewer_distance + z)
-        return point(x * factor + size[0] / 2, -y * factor + size[1] / 2, z)
 
+class mesh(object):
+    """
+    A polyhedron, drawn as flat polygons.
 
-def sine_wave(min, max, step=1):
-    angle = 0
-    diff = max - min
-    diff2 = diff / 2
-    offset = min + diff2
-    while True:
-        yield angle, offset + math.sin(radians(angle)) * diff2
-        angle += step
+    :param vertices: The ``(x, y, z)`` coordinates of the vertices.
+    :param faces: For each face, a tuple of the indices of its vertices (in
+        anticlockwise order, as seen from outside) and its colour. If the
+        colour is ``None``, the face is shaded instead.
+    """
+    def __init__(self, vertices, faces):
+        self.vertices = [tuple(map(float, v)) for v in vertices]
+        self.faces = [tuple(indices) for indices, _ in faces]
+        self.colors = [color for _, color in faces]
+        self.normals = [self.normal(*[self.vertices[i] for i in indices[:3]]) for indices in self.faces]
 
+        if np is not None:
+            self.vertex_array = np.array(self.vertices).reshape(-1, 3)
+            self.normal_array = np.array(self.normals).reshape(-1, 3)
+            self.flat_indices = np.array([i for indices in self.faces for i in indices], dtype=np.intp)
+            self.counts = np.array([len(indices) for indices in self.faces])
+            self.starts = np.concatenate(([0], np.cumsum(self.counts)[:-1]))
+            self.first_three = np.array([indices[:3] for indices in self.faces], dtype=np.intp).reshape(-1, 3)
 
-def main(num_iterations=sys.maxsize):
+    @staticmethod
+    def normal(a, b, c):
+        u = [b[i] - a[i] for i in range(3)]
+        v = [c[i] - a[i] for i in range(3)]
+        n = (u[1] * v[2] - u[2] * v[1], u[2] * v[0] - u[0] * v[2], u[0] * v[1] - u[1] * v[0])
+        length = math.sqrt(sum(x * x for x in n)) or 1
+        return tuple(x / length for x in n)
+
+    def shade(self, idx, facing):
+        color = self.colors[idx]
+        if color is None:
+            brightness = 0.25 + 0.75 * max(0, facing)
+            color = tuple(int(c * brightness) for c in BASE_COLOR)
+        return color
+
+    def draw_numpy(self, rotation, projection):
+        projection = np.array(projection)
+        h = self.vertex_array @ projection[:, :3].T + projection[:, 3]
+        xy = h[:, :2] / h[:, 2:]
+
+        # Back-face culling: the vertices of faces towards the viewer run
+        # clockwise on the screen (whose y axis points down)
+        a, b, c = (xy[self.first_three[:, i]] for i in range(3))
+        cross = (b[:, 0] - a[:, 0]) * (c[:, 1] - a[:, 1]) - (b[:, 1] - a[:, 1]) * (c[:, 0] - a[:, 0])
+        depth = np.add.reduceat(h[self.flat_indices, 2], self.starts) / self.counts
+        visible = np.flatnonzero(cross > 0)
+        order = visible[np.argsort(-depth[visible], kind="stable")]
+
+        facing = -(self.normal_array @ np.array(rotation)[2])
+        return xy.tolist(), order.tolist(), facing.tolist()
+
+    def draw_python(self, rotation, projection):
+        h = [tuple(row[0] * x + row[1] * y + row[2] * z + row[3] for row in projection)
+             for x, y, z in self.vertices]
+        xy = [(x / w, y / w) for x, y, w in h]
+
+        visible = []
+        for idx, indices in enumerate(self.faces):
+            (ax, ay), (bx, by), (cx, cy) = (xy[i] for i in indices[:3])
+            if (bx - ax) * (cy - ay) - (by - ay) * (cx - ax) > 0:
+                depth = sum(h[i][2] for i in indices) / len(indices)
+                visible.append((depth, idx))
+        order = [idx for _, idx in sorted(visible, key=lambda item: -item[0])]
+
+        facing = [-sum(rotation[2][i] * n[i] for i in range(3)) for n in self.normals]
+        return xy, order, facing
+
+    def render(self, draw, rotation, projection, wireframe=False):
+        """
+        Draws the faces of the mesh which are pointing towards the viewer,
+        furthest first.
+
+        :param rotation: 3x3 rotation matrix.
+        :param projection: 3x4 combined rotation and projection matrix, from
+            :py:func:`projection_matrix`.
+        :param wireframe: Draw the faces as white outlines.
+        :type wireframe: bool
+        """
+        if USE_NUMPY and np is not None:
+            xy, order, facing = self.draw_numpy(rotation, projection)
+        else:
+            xy, order, facing = self.draw_python(rotation, projection)
+
+        for idx in order:
+            points = [xy[i] for i in self.faces[idx]]
+            if wireframe:
+                draw.polygon(points, "black", "white")
+            else:
+                color = self.shade(idx, facing[idx])
+                draw.polygon(points, color, color)
 
-    regulator = framerate_regulator(fps=30)
 
+def box():
     vertices = [
-        point(-1, 1, -1),
-        point(1, 1, -1),
-        point(1, -1, -1),
-        point(-1, -1, -1),
-        point(-1, 1, 1),
-        point(1, 1, 1),
-        point(1, -1, 1),
-        point(-1, -1, 1)
+        (-1, 1, -1),
+        (1, 1, -1),
+        (1, -1, -1),
+        (-1, -1, -1),
+        (-1, 1, 1),
+        (1, 1, 1),
+        (1, -1, 1),
+        (-1, -1, 1)
     ]
 
     faces = [
@@ -91,6 +197,79 @@ def main(num_iterations=sys.maxsize):
         ((3, 2, 6, 7), "cyan")
     ]
 
+    return mesh(vertices, faces)
+
+
+def torus(major_segments=24, minor_segments=12, major_radius=1.1, minor_radius=0.5):
+    vertices = []
+    for i in range(major_segments):
+        theta = 2 * math.pi * i / major_segments
+        for j in range(minor_segments):
+            phi = 2 * math.pi * j / minor_segments
+            r = major_radius + minor_radius * math.cos(phi)
+            vertices.append((r * math.cos(theta), r * math.sin(theta), minor_radius * math.sin(phi)))
+
+    faces = []
+    for i in range(major_segments):
+        for j in range(minor_segments):
+            i2, j2 = (i + 1) % major_segments, (j + 1) % minor_segments
+            indices = (i * minor_segments + j, i2 * minor_segments + j,
+                       i2 * minor_segments + j2, i * minor_segments + j2)
+            faces.append((indices, None))
+
+    return mesh(vertices, faces)
+
+
+def load_obj(path, radius=1.7):
+    """
+    Loads the vertices and faces of a Wavefront OBJ file (ignoring texture
+    coordinates, normals and materials), centred and scaled to fit within a
+    sphere of the given radius.
+    """
+    vertices = []
+    faces = []
+    with open(path) as f:
+        for line in f:
+            fields = line.split()
+            if not fields:
+                continue
+            if fields[0] == "v":
+                vertices.append(tuple(float(x) for x in fields[1:4]))
+            elif fields[0] == "f":
+                # Indices are 1-based, or relative to the end if negative
+                indices = [int(field.split("/")[0]) for field in fields[1:]]
+                faces.append((tuple(i - 1 if i > 0 else len(vertices) + i for i in indices), None))
+
+    center = [(min(v[i] for v in vertices) + max(v[i] for v in vertices)) / 2 for i in range(3)]
+    vertices = [tuple(v[i] - center[i] for i in range(3)) for v in vertices]
+    scale = radius / (max(math.sqrt(sum(x * x for x in v)) for v in vertices) or 1)
+    vertices = [tuple(x * scale for x in v) for v in vertices]
+    return mesh(vertices, faces)
+
+
+def sine_wave(min, max, step=1):
+    angle = 0
+    diff = max - min
+    diff2 = diff / 2
+    offset = min + diff2
+    while True:
+        yield angle, offset + math.sin(radians(angle)) * diff2
+        angle += step
+
+
+def main(num_iterations=sys.maxsize):
+    if USE_NUMPY and np is None:
+        print("The numpy library could not be found, falling back to the slower pure Python renderer. Install it using 'sudo -H pip install numpy'.")
+
+    regulator = framerate_regulator(fps=30)
+
+    if MESH == "box":
+        shape = box()
+    elif MESH == "torus":
+        shape = torus()
+    else:
+        shape = load_obj(MESH)
+
     a, b, c = 0, 0, 0
 
     for angle, dist in sine_wave(8, 40, 1.5):
@@ -99,25 +278,11 @@ def main(num_iterations=sys.maxsize):
             if num_iterations == 0:
                 break
 
-            t = [v.rotate_x(a).rotate_y(b).rotate_z(c).project(device.size, 256, dist)
-                for v in vertices]
-
-            depth = []
-            for idx, face in enumerate(faces):
-                v1, v2, v3, v4 = face[0]
-                avg_z = (t[v1].z + t[v2].z + t[v3].z + t[v4].z) / 4.0
-                depth.append((idx, avg_z))
+            rotation = rotation_matrix(a, b, c)
+            projection = projection_matrix(rotation, device.size, FOV, dist)
 
             with canvas(device, dither=True) as draw:
-                for idx, depth in sorted(depth, key=itemgetter(1), reverse=True)[3:]:
-                    (v1, v2, v3, v4), color = faces[idx]
-
-                    if angle // 720 % 2 == 0:
-                        fill, outline = color, color
-                    else:
-                        fill, outline = "black", "white"
-
-                    draw.polygon(t[v1].xy + t[v2].xy + t[v3].xy + t[v4].xy, fill, outline)
+                shape.render(draw, rotation, projection, wireframe=angle // 720 % 2 == 1)
 
             a += 0.3
             b -= 1.1
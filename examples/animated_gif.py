@@ -1,32 +1,116 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
-# Copyright (c) 2017-2020 Richard Hull and contributors
+# Copyright (c) 2017-2026 Richard Hull and contributors
 # See LICENSE.rst for details.
 # PYTHON_ARGCOMPLETE_OK
 
 """
 Displays an animated gif.
+
+Each frame is decoded, resized and converted for the device just once, and
+then replayed from memory, with each frame shown for its own duration.
 """
 
+import time
 from pathlib import Path
 from demo_opts import get_device
 from PIL import Image, ImageSequence
-from luma.core.sprite_system import framerate_regulator
+
+
+# The most memory (in bytes) to hold composed frames in: any frames beyond
+# this are decoded again each time they come round.
+BYTE_BUDGET = 16 * 1024 * 1024
+
+# Used for frames which don't specify a duration (in milliseconds)
+DEFAULT_DURATION = 100
+
+
+def image_bytes(image):
+    """
+    The (approximate) number of bytes of pixel data held by the image.
+    """
+    if image.mode == "1":
+        return ((image.width + 7) // 8) * image.height
+    return image.width * image.height * len(image.getbands())
+
+
+class frame_cache(object):
+    """
+    Holds every frame of an animation pre-composed for the device, together
+    with its duration in seconds. Frames are composed up front until the byte
+    budget is used up; the remainder are recomposed on demand.
+
+    :param animation: The animated image.
+    :type animation: PIL.Image.Image
+    :param compose: Function that turns a frame of the animation into an image
+        ready to display.
+    :param byte_budget: The most memory to use for cached frames.
+    :type byte_budget: int
+    """
+    def __init__(self, animation, compose, byte_budget=BYTE_BUDGET):
+        self.animation = animation
+        self.compose = compose
+        self.frames = []
+        self.durations = []
+        self.bytes_used = 0
+
+        full = False
+        for frame in ImageSequence.Iterator(animation):
+            self.durations.append((frame.info.get("duration") or DEFAULT_DURATION) / 1000.0)
+            image = None
+            if not full:
+                image = compose(frame)
+                size = image_bytes(image)
+                if self.bytes_used + size <= byte_budget:
+                    self.bytes_used += size
+                else:
+                    # Keep the uncached frames contiguous, so that decoding
+                    # them on demand only ever seeks forwards
+                    image = None
+                    full = True
+            self.frames.append(image)
+
+    def __len__(self):
+        return len(self.frames)
+
+    def __getitem__(self, index):
+        image = self.frames[index]
+        if image is None:
+            self.animation.seek(index)
+            image = self.compose(self.animation)
+        return image
+
+    def __iter__(self):
+        for index, duration in enumerate(self.durations):
+            yield self[index], duration
 
 
 def main():
-    regulator = framerate_regulator(fps=10)
     img_path = str(Path(__file__).resolve().parent.joinpath('images', 'banana.gif'))
     banana = Image.open(img_path)
     size = [min(*device.size)] * 2
     posn = ((device.width - size[0]) // 2, device.height - size[1])
 
+    def compose(frame):
+        background = Image.new("RGB", device.size, "white")
+        background.paste(frame.resize(size, resample=Image.LANCZOS), posn)
+        return background.convert(device.mode)
+
+    frames = frame_cache(banana, compose)
+
+    next_frame = time.monotonic()
     while True:
-        for frame in ImageSequence.Iterator(banana):
-            with regulator:
-                background = Image.new("RGB", device.size, "white")
-                background.paste(frame.resize(size, resample=Image.LANCZOS), posn)
-                device.display(background.convert(device.mode))
+        for image, duration in frames:
+            device.display(image)
+
+            # Schedule from when this frame was due rather than when it was
+            # displayed, so that the timing does not drift
+            next_frame += duration
+            delay = next_frame - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                next_frame = time.monotonic()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,370 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2026 Richard Hull and contributors
+# See LICENSE.rst for details.
+# PYTHON_ARGCOMPLETE_OK
+
+"""
+Headless benchmark for the examples.
+
+Drives the render loop of each example for a fixed number of frames against
+a :py:class:`luma.core.device.dummy` device (no display hardware needed) and
+reports, per example, the time spent producing each frame, the time spent
+inside ``device.display``, the p50/p95/p99 frame times and the memory
+allocated per frame. The results are written as JSON so that runs can be
+diffed between releases.
+
+Any pacing (``time.sleep`` and :py:class:`framerate_regulator` delays) is
+disabled while benchmarking, unless ``--paced`` is given.
+
+Example:
+
+  $ python benchmark.py --width 128 --height 128 --frames 200 > before.json
+  $ python benchmark.py --width 128 --height 128 --frames 200 chroma starfield
+
+Module-level settings of an example can be overridden with ``--set``, e.g. to
+see how the starfield scales with the number of stars:
+
+  $ for n in 500 2000 10000 50000; do
+  >   python benchmark.py --width 320 --height 240 --set starfield.NUM_STARS=$n starfield
+  > done
+
+or how the cost of drawing the space invaders grows with the size of their
+army (``invaders_army`` just marches the army, without the game logic):
+
+  $ for n in 6 12 24 48; do
+  >   python benchmark.py --width 640 --height 480 --set invaders.ARMY_SIZE_COLS=$n \\
+  >     --set invaders.ARMY_SIZE_ROWS=$n invaders_army
+  > done
+"""
+
+import sys
+import json
+import math
+import time
+import ast
+import random
+import datetime
+import platform
+import argparse
+import importlib
+import tracemalloc
+from contextlib import contextmanager
+
+from PIL import Image
+
+import luma.core
+import luma.core.sprite_system
+from luma.core.device import dummy
+from luma.core.render import canvas
+
+
+class StopBenchmark(Exception):
+    """
+    Raised from inside the example's render loop once enough frames have
+    been collected.
+    """
+    pass
+
+
+class benchmark_device(dummy):
+    """
+    Dummy device which records how long the example took to produce each
+    frame (measured between successive calls to ``display``), and how long
+    the ``display`` itself took.
+
+    :param frames: Number of frames to record before stopping the example.
+    :type frames: int
+    :param warmup: Number of initial frames to discard (e.g. to exclude font
+        loading and other one-off setup).
+    :type warmup: int
+    :param trace_allocations: When set, also records the peak memory allocated
+        while producing each frame. This uses :py:mod:`tracemalloc`, which
+        slows everything down considerably, so the timings of such a run
+        should not be relied upon.
+    :type trace_allocations: bool
+    """
+    def __init__(self, frames, warmup=0, trace_allocations=False, **kwargs):
+        super(benchmark_device, self).__init__(**kwargs)
+        self.frames = frames
+        self.warmup = warmup
+        self.trace_allocations = trace_allocations
+        self.render_times = []
+        self.display_times = []
+        self.allocations = []
+        self.called = 0
+        self.baseline = 0
+        self.last_time = None
+
+    def start(self):
+        if self.trace_allocations:
+            tracemalloc.start()
+            self.baseline = tracemalloc.get_traced_memory()[0]
+        self.last_time = time.perf_counter()
+
+    def stop(self):
+        if self.trace_allocations:
+            tracemalloc.stop()
+
+    def display(self, image):
+        start = time.perf_counter()
+        super(benchmark_device, self).display(image)
+        end = time.perf_counter()
+
+        self.called += 1
+        if self.called > self.warmup:
+            self.render_times.append(start - self.last_time)
+            self.display_times.append(end - start)
+            if self.trace_allocations:
+                current, peak = tracemalloc.get_traced_memory()
+                self.allocations.append(peak - self.baseline)
+
+        if self.trace_allocations:
+            tracemalloc.reset_peak()
+            self.baseline = tracemalloc.get_traced_memory()[0]
+
+        if len(self.render_times) >= self.frames:
+            raise StopBenchmark()
+
+        self.last_time = time.perf_counter()
+
+    def clear(self):
+        # Not counted as a frame
+        dummy.display(self, Image.new(self.mode, self.size))
+
+
+def run_main(module, device):
+    module.device = device
+    module.main()
+
+
+class ticking_datetime(datetime.datetime):
+    """
+    Stands in for ``datetime.datetime`` in the clock example, moving on a
+    second every time the time is asked for: the clock only redraws when the
+    second changes, so with sleeping disabled it would otherwise spin without
+    producing frames.
+    """
+    current = datetime.datetime(2026, 1, 1)
+
+    @classmethod
+    def now(cls, tz=None):
+        cls.current += datetime.timedelta(seconds=1)
+        return cls.current
+
+
+def run_clock(module, device):
+    module.datetime = type(datetime)("datetime")
+    module.datetime.datetime = ticking_datetime
+    run_main(module, device)
+
+
+def run_matrix(module, device):
+    module.matrix(device)
+
+
+def run_sys_histogram(module, device):
+    histogramData, histogramTime = module.init_histogram()
+    while True:
+        module.main(device, histogramData, histogramTime)
+
+
+def run_invaders_army(module, device):
+    aliens = module.army(module.ARMY_SIZE_ROWS, module.ARMY_SIZE_COLS)
+    while True:
+        with canvas(device) as draw:
+            aliens.update([])
+            aliens.render(draw)
+
+
+# Example module name -> function that runs its render loop on the device
+examples = {
+    "3d_box": run_main,
+    "animated_gif": run_main,
+    "bounce": run_main,
+    "carousel": run_main,
+    "chroma": run_main,
+    "clock": run_clock,
+    "crawl": run_main,
+    "game_of_life": run_main,
+    "invaders": run_main,
+    "invaders_army": run_invaders_army,
+    "jetset_willy": run_main,
+    "matrix": run_matrix,
+    "matrix_intensity": run_matrix,
+    "maze": run_main,
+    "runner": run_main,
+    "starfield": run_main,
+    "sys_histogram": run_sys_histogram,
+    "tv_snow": run_main,
+    "welcome": run_main,
+}
+
+# Benchmarks which exercise part of an example, rather than the example's
+# own render loop -> the example module
+modules = {
+    "invaders_army": "invaders",
+}
+
+
+def no_sleep(secs):
+    pass
+
+
+@contextmanager
+def unpaced():
+    """
+    Temporarily disable ``time.sleep``, so that the examples run flat out.
+    """
+    saved = time.sleep, luma.core.sprite_system.sleep
+    time.sleep = luma.core.sprite_system.sleep = no_sleep
+    try:
+        yield
+    finally:
+        time.sleep, luma.core.sprite_system.sleep = saved
+
+
+def percentile(values, pct):
+    """
+    Nearest-rank percentile of a (non-empty) list of values.
+    """
+    ordered = sorted(values)
+    rank = max(0, math.ceil(pct / 100.0 * len(ordered)) - 1)
+    return ordered[rank]
+
+
+def summarize(values, scale=1000.0):
+    values = [v * scale for v in values]
+    return {
+        "mean": sum(values) / len(values),
+        "p50": percentile(values, 50),
+        "p95": percentile(values, 95),
+        "p99": percentile(values, 99),
+        "max": max(values),
+    }
+
+
+def seed(value):
+    random.seed(value)
+    try:
+        import numpy
+        numpy.random.seed(value)
+    except ImportError:
+        pass
+
+
+def parse_setting(setting):
+    """
+    Parses a ``MODULE.NAME=VALUE`` override, where the value is a Python
+    literal (anything else is taken as a string).
+    """
+    target, _, value = setting.partition("=")
+    module, _, attr = target.rpartition(".")
+    if not module or not attr or not _:
+        raise argparse.ArgumentTypeError(f"expected MODULE.NAME=VALUE, got: {setting}")
+    try:
+        value = ast.literal_eval(value)
+    except (ValueError, SyntaxError):
+        pass
+    return module, attr, value
+
+
+def run(name, device, args):
+    seed(args.seed)
+    module = importlib.import_module(modules.get(name, name))
+    for target, attr, value in args.set:
+        if target == module.__name__:
+            setattr(module, attr, value)
+    device.start()
+    try:
+        examples[name](module, device)
+    except StopBenchmark:
+        pass
+    finally:
+        device.stop()
+
+
+def benchmark(name, args):
+    """
+    Benchmark a single example, returning a dictionary of results.
+    """
+    size = dict(width=args.width, height=args.height, mode=args.mode)
+
+    device = benchmark_device(args.frames, args.warmup, **size)
+    run(name, device, args)
+    if not device.render_times:
+        raise RuntimeError("example finished without rendering any frames")
+
+    frame_times = [r + d for r, d in zip(device.render_times, device.display_times)]
+    result = {
+        "frames": len(frame_times),
+        "fps": len(frame_times) / sum(frame_times),
+        "frame_ms": summarize(frame_times),
+        "render_ms": summarize(device.render_times),
+        "display_ms": summarize(device.display_times),
+    }
+
+    if args.alloc_frames > 0:
+        device = benchmark_device(args.alloc_frames, args.warmup, trace_allocations=True, **size)
+        run(name, device, args)
+        if device.allocations:
+            result["allocated_kb"] = summarize(device.allocations, 1 / 1024.0)
+
+    return result
+
+
+def main(actual_args=None):
+    parser = argparse.ArgumentParser(description="Benchmark the luma.examples render loops")
+    parser.add_argument("examples", nargs="*", metavar="EXAMPLE", help=f"Examples to run (default: all). Allowed values are: {', '.join(examples)}")
+    parser.add_argument("--frames", "-n", type=int, default=100, help="Number of frames to time per example")
+    parser.add_argument("--warmup", type=int, default=5, help="Number of initial frames to discard")
+    parser.add_argument("--alloc-frames", type=int, default=20, help="Number of frames to trace memory allocations for, in a separate run (0 to disable)")
+    parser.add_argument("--width", type=int, default=128, help="Width of the dummy device")
+    parser.add_argument("--height", type=int, default=64, help="Height of the dummy device")
+    parser.add_argument("--mode", type=str, default="RGB", choices=["1", "RGB", "RGBA"], help="Colour mode of the dummy device")
+    parser.add_argument("--seed", type=int, default=1234, help="Random seed, so that runs are comparable")
+    parser.add_argument("--set", type=parse_setting, action="append", default=[], metavar="MODULE.NAME=VALUE", help="Override a module-level setting of an example, e.g. starfield.NUM_STARS=10000")
+    parser.add_argument("--paced", action="store_true", help="Keep the examples' own sleeps and frame rate regulation")
+    parser.add_argument("--output", "-o", type=str, help="Write the JSON report to this file instead of stdout")
+    args = parser.parse_args(actual_args)
+
+    for name in args.examples:
+        if name not in examples:
+            parser.error(f"unknown example: {name}")
+
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "luma.core": luma.core.__version__,
+        "device": {"width": args.width, "height": args.height, "mode": args.mode},
+        "frames": args.frames,
+        "paced": args.paced,
+        "settings": {f"{module}.{attr}": value for module, attr, value in args.set},
+        "results": {},
+    }
+
+    for name in args.examples or examples:
+        sys.stderr.write(f"Benchmarking {name}...\n")
+        try:
+            if args.paced:
+                result = benchmark(name, args)
+            else:
+                with unpaced():
+                    result = benchmark(name, args)
+        except Exception as e:
+            result = {"error": f"{type(e).__name__}: {e}"}
+        report["results"][name] = result
+
+    output = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        pass
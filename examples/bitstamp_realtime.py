@@ -12,7 +12,6 @@ import sys
 import time
 import signal
 import json
-from pathlib import Path
 
 try:
     import pusherclient
@@ -22,15 +21,14 @@ except ImportError:
     sys.exit()
 
 from demo_opts import get_device
+from font_registry import make_font
 from luma.core.render import canvas
-from PIL import ImageFont
 
 # Bitstamp uses Pusher for websocket communication. This is their public Pusher key.
 # Refer to https://www.bitstamp.net/websocket/ for more documentation.
 BITSTAMP_PUSHER_KEY = 'de504dc5763aeef9ff52'
 
-font_path = str(Path(__file__).resolve().parent.joinpath('fonts', 'C&C Red Alert [INET].ttf'))
-font = ImageFont.truetype(font_path, 12)
+font = make_font('C&C Red Alert [INET].ttf', 12)
 
 rows = []
 
@@ -17,7 +17,6 @@ LTC/USD $40.00
 
 import sys
 import time
-from pathlib import Path
 
 try:
     import requests
@@ -26,8 +25,8 @@ except ImportError:
     sys.exit()
 
 from demo_opts import get_device
+from font_registry import make_font
 from luma.core.render import canvas
-from PIL import ImageFont
 
 
 def fetch_price(crypto_currency, fiat_currency):
@@ -49,8 +48,7 @@ def get_price_text(crypto_currency, fiat_currency):
 
 def show_price(device):
     # use custom font
-    font_path = str(Path(__file__).resolve().parent.joinpath('fonts', 'C&C Red Alert [INET].ttf'))
-    font2 = ImageFont.truetype(font_path, 12)
+    font2 = make_font('C&C Red Alert [INET].ttf', 12)
 
     with canvas(device) as draw:
         rows = get_price_text("BTC", "USD")
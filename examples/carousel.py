@@ -18,9 +18,11 @@ Needs psutil (+ dependencies) installed::
 import psutil
 
 from demo_opts import get_device
-from luma.core.virtual import viewport, snapshot
+from luma.core.virtual import snapshot
+from tiled_viewport import tiled_viewport
 
 from hotspot import memory, uptime, cpu_load, clock, network, disk
+from hotspot.metrics import metrics
 
 
 def position(max):
@@ -58,6 +60,9 @@ def first(iterable, default=None):
 
 
 def main():
+    # Sample psutil in the background, so slow calls can't stall scrolling
+    metrics.start()
+
     if device.rotate in (0, 2):
         # Horizontal
         widget_width = device.width // 2
@@ -88,7 +93,7 @@ def main():
     widgets = [cpuload, utime, clk, net_wlan, net_eth, net_lo, mem, dsk]
 
     if device.rotate in (0, 2):
-        virtual = viewport(device, width=widget_width * len(widgets), height=widget_height)
+        virtual = tiled_viewport(device, width=widget_width * len(widgets), height=widget_height)
         for i, widget in enumerate(widgets):
             virtual.add_hotspot(widget, (i * widget_width, 0))
 
@@ -96,7 +101,7 @@ def main():
             virtual.set_position((x, 0))
 
     else:
-        virtual = viewport(device, width=widget_width, height=widget_height * len(widgets))
+        virtual = tiled_viewport(device, width=widget_width, height=widget_height * len(widgets))
         for i, widget in enumerate(widgets):
             virtual.add_hotspot(widget, (0, i * widget_height))
 
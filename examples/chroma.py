@@ -11,8 +11,19 @@ import math
 import time
 import colorsys
 
+from PIL import Image, ImageDraw
+
 from demo_opts import get_device
-from luma.core.render import canvas
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+# Render with the NumPy engine when available; set to False to use the
+# original per-pixel Python path (e.g. to compare the two frame-for-frame).
+USE_NUMPY = True
 
 
 # twisty swirly goodness
@@ -145,29 +156,193 @@ def tunnel(x, y, step):
     return (col[0] * 255, col[1] * 255, col[2] * 255)
 
 
+# NumPy counterparts of the effects above: these take whole arrays of x & y
+# coordinates and return arrays of r, g & b, and should produce the same
+# output as their scalar versions pixel-for-pixel.
+
+def swirl_np(x, y, step):
+    x = x - (device.width / 4)
+    y = y - (device.height / 4)
+
+    dist = np.sqrt(x ** 2 + y ** 2) / 2.0
+    angle = (step / 10.0) + (dist * 1.5)
+    s = np.sin(angle)
+    c = np.cos(angle)
+
+    xs = x * c - y * s
+    ys = x * s + y * c
+
+    r = np.abs(xs + ys)
+    r = r * 64.0
+    r -= 20
+
+    return (r, r + (s * 130), r + (c * 130))
+
+
+def checker_np(x, y, step):
+    x = x - (device.width / 4)
+    y = y - (device.height / 4)
+
+    angle = (step / 10.0)
+    s = math.sin(angle)
+    c = math.cos(angle)
+
+    xs = x * c - y * s
+    ys = x * s + y * c
+
+    xs -= math.sin(step / 200.0) * 40.0
+    ys -= math.cos(step / 200.0) * 40.0
+
+    scale = (math.sin(step / 50.0) / 8.0) + 0.25
+
+    xs *= scale
+    ys *= scale
+
+    xo = np.abs(xs) - np.floor(np.abs(xs))
+    yo = np.abs(ys) - np.floor(np.abs(ys))
+    l = np.where((np.floor(xs) + np.floor(ys)) % 2, 0, np.where((xo > .1) & (yo > .1), 1, .5))
+
+    # with full saturation, hsv_to_rgb is linear in the value component
+    r, g, b = colorsys.hsv_to_rgb((step % 255) / 255.0, 1, 1)
+
+    return (l * r * 255, l * g * 255, l * b * 255)
+
+
+def blues_and_twos_np(x, y, step):
+    x = x - (device.width / 2)
+    y = y - (device.height / 2)
+
+    scale = math.sin(step / 6.0) / 1.5
+    r = np.sin((x * scale) / 1.0) + np.cos((y * scale) / 1.0)
+    b = np.sin(x * scale / 2.0) + np.cos(y * scale / 2.0)
+    g = np.maximum(r - .8, 0)
+
+    b -= r
+    b /= 1.4
+
+    return (r * 255, (b + g) * 255, g * 255)
+
+
+def rainbow_search_np(x, y, step):
+    xs = math.sin((step) / 100.0) * 20.0
+    ys = math.cos((step) / 100.0) * 20.0
+
+    scale = ((math.sin(step / 60.0) + 1.0) / 5.0) + 0.2
+    r = np.sin((x + xs) * scale) + np.cos((y + xs) * scale)
+    g = np.sin((x + xs) * scale) + np.cos((y + ys) * scale)
+    b = np.sin((x + ys) * scale) + np.cos((y + ys) * scale)
+
+    return (r * 255, g * 255, b * 255)
+
+
+def tunnel_np(x, y, step):
+
+    speed = step / 100.0
+    x = x - (device.width / 4) + math.sin(step / 27.0) * 2
+    y = y - (device.height / 4) + math.cos(step / 18.0) * 2
+
+    on_axis = y == 0
+    angle = np.where(on_axis,
+                     np.where(x < 0, -(math.pi / 2), (math.pi / 2)),
+                     np.arctan(x / np.where(on_axis, 1, y)))
+    angle = np.where(y > 0, angle + math.pi, angle)
+
+    angle /= 2 * math.pi  # convert angle to 0...1 range
+
+    dist = np.sqrt(x ** 2 + y ** 2)
+    shade = np.minimum(dist / 2.1, 1)
+
+    angle += speed
+    depth = speed + (dist / 10)
+
+    col1 = colorsys.hsv_to_rgb((step % 255) / 255.0, 1, .8)
+    col2 = colorsys.hsv_to_rgb((step % 255) / 255.0, 1, .3)
+
+    use_col1 = np.floor(np.abs(angle * 6.0)) % 2 == 0
+    td = np.where(np.floor(np.abs(depth * 3.0)) % 2 == 0, .3, 0)
+
+    return tuple((np.where(use_col1, c1, c2) + td) * shade * 255
+                 for c1, c2 in zip(col1, col2))
+
+
+vectorized = {
+    swirl: swirl_np,
+    checker: checker_np,
+    blues_and_twos: blues_and_twos_np,
+    rainbow_search: rainbow_search_np,
+    tunnel: tunnel_np,
+}
+
+
+def render_python(effects, i, step):
+    """
+    Render one frame of the current effect, evaluating every pixel in pure
+    Python and drawing each one as a 2x2 block.
+    """
+    image = Image.new("RGB", device.size)
+    draw = ImageDraw.Draw(image)
+    for y in range(device.height // 2):
+        for x in range(device.width // 2):
+            r, g, b = effects[0](x, y, step)
+            if i > 400:
+                r2, g2, b2 = effects[-1](x, y, step)
+
+                ratio = (500.00 - i) / 100.0
+                r = r * ratio + r2 * (1.0 - ratio)
+                g = g * ratio + g2 * (1.0 - ratio)
+                b = b * ratio + b2 * (1.0 - ratio)
+            r = int(max(0, min(255, r)))
+            g = int(max(0, min(255, g)))
+            b = int(max(0, min(255, b)))
+            x2 = x * 2
+            y2 = y * 2
+            draw.rectangle((x2, y2, x2 + 1, y2 + 1), fill=(r, g, b))
+    del draw
+    return image
+
+
+def render_numpy(effects, i, step, grid, frame):
+    """
+    Render one frame of the current effect by evaluating the whole (half
+    resolution) grid at once, then doubling it up into the frame buffer.
+    """
+    x, y = grid
+    r, g, b = vectorized[effects[0]](x, y, step)
+    if i > 400:
+        r2, g2, b2 = vectorized[effects[-1]](x, y, step)
+
+        ratio = (500.00 - i) / 100.0
+        r = r * ratio + r2 * (1.0 - ratio)
+        g = g * ratio + g2 * (1.0 - ratio)
+        b = b * ratio + b2 * (1.0 - ratio)
+
+    rgb = np.clip(np.dstack((r, g, b)), 0, 255).astype(np.uint8)
+    h, w = x.shape
+    frame[:h * 2, :w * 2] = rgb.repeat(2, axis=0).repeat(2, axis=1)
+    return Image.fromarray(frame)
+
+
 def main():
     effects = [tunnel, rainbow_search, checker, swirl]
 
+    use_numpy = USE_NUMPY
+    if use_numpy and np is None:
+        print("The numpy library could not be found, falling back to the pure-Python renderer. Install it using 'sudo -H pip install numpy'.")
+        use_numpy = False
+
+    if use_numpy:
+        y, x = np.mgrid[0:device.height // 2, 0:device.width // 2].astype(float)
+        grid = (x, y)
+        frame = np.zeros((device.height, device.width, 3), dtype=np.uint8)
+
     step = 0
     while True:
         for i in range(500):
-            with canvas(device, dither=True) as draw:
-                for y in range(device.height // 2):
-                    for x in range(device.width // 2):
-                        r, g, b = effects[0](x, y, step)
-                        if i > 400:
-                            r2, g2, b2 = effects[-1](x, y, step)
-
-                            ratio = (500.00 - i) / 100.0
-                            r = r * ratio + r2 * (1.0 - ratio)
-                            g = g * ratio + g2 * (1.0 - ratio)
-                            b = b * ratio + b2 * (1.0 - ratio)
-                        r = int(max(0, min(255, r)))
-                        g = int(max(0, min(255, g)))
-                        b = int(max(0, min(255, b)))
-                        x2 = x * 2
-                        y2 = y * 2
-                        draw.rectangle((x2, y2, x2 + 1, y2 + 1), fill=(r, g, b))
+            if use_numpy:
+                image = render_numpy(effects, i, step, grid, frame)
+            else:
+                image = render_python(effects, i, step)
+            device.display(image.convert(device.mode))
 
             step += 1
 
@@ -6,16 +6,23 @@
 
 """
 A vertical scrolling demo, which should be familiar.
+
+On SSD1306-family displays, the scrolling is done by moving the display's
+start line, so that only the newly exposed rows are sent each step.
 """
 
 import time
+import logging
 from pathlib import Path
 from demo_opts import get_device
-from luma.core.virtual import viewport
+from tiled_viewport import tiled_viewport, scroller
 from luma.core.render import canvas
 from PIL import Image
 
 
+# Scroll using the display's start line, on devices which have one
+HARDWARE_SCROLL = True
+
 blurb = """
 
 
@@ -57,7 +64,8 @@ def main():
     img_path = str(Path(__file__).resolve().parent.joinpath('images', 'starwars.png'))
     logo = Image.open(img_path)
 
-    virtual = viewport(device, width=device.width, height=768)
+    scroll = scroller(device, hardware=HARDWARE_SCROLL)
+    virtual = tiled_viewport(device, width=device.width, height=768, scroller=scroll)
 
     for _ in range(2):
         with canvas(virtual) as draw:
@@ -81,6 +89,8 @@ def main():
         virtual.set_position((0, y))
         time.sleep(0.01)
 
+    logging.info(f"Scrolling: {scroll.stats()}")
+
 
 if __name__ == "__main__":
     try:
@@ -3,9 +3,25 @@
 # See LICENSE.rst for details.
 
 import sys
+import time
+import atexit
+import signal
 import logging
+import cProfile
+import threading
+from math import sqrt
+from collections import deque
+
+from PIL import Image, ImageChops
 
 from luma.core import cmdline, error
+from luma.core.render import canvas
+import luma.core.sprite_system
+
+try:
+    from luma.oled.device import ssd1306
+except ImportError:
+    ssd1306 = None
 
 
 # logging
@@ -40,6 +56,411 @@ def display_settings(device, args):
     return f'Version: {version}\nDisplay: {args.display}\n{iface}Dimensions: {device.width} x {device.height}\n{"-" * 60}'
 
 
+class frame_profiler(object):
+    """
+    Times the phases of each frame rendered by an example, without the
+    example itself needing to be changed: a frame ends every time the device's
+    ``display`` method is called, and the time since the previous frame is
+    split up into:
+
+    * ``draw``: inside a :py:class:`luma.core.render.canvas` with-block
+    * ``convert``: converting (and dithering) the canvas to the device mode
+    * ``transfer``: inside ``device.display``
+    * ``sleep``: pacing, by ``time.sleep`` or a ``framerate_regulator``
+    * ``simulate``: everything else
+
+    The most recent samples of each phase are kept, and summarized as
+    histograms by :py:meth:`report`.
+
+    :param history: The number of recent frames to keep samples for.
+    :type history: int
+    :param cprofile_frames: If greater than zero, run :py:mod:`cProfile` for
+        this many frames and then write the stats to ``cprofile_output``.
+    :type cprofile_frames: int
+    :param cprofile_output: The filename to write the pstats data to.
+    :type cprofile_output: str
+    """
+    phases = ("simulate", "draw", "convert", "transfer", "sleep")
+    buckets = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+    def __init__(self, history=1000, cprofile_frames=0, cprofile_output="profile.pstats"):
+        self.samples = {phase: deque(maxlen=history) for phase in self.phases + ("frame",)}
+        self.frames = 0
+        self.current = dict.fromkeys(self.phases, 0.0)
+        self.frame_start = time.perf_counter()
+        self.draw_start = None
+        self.exit_start = None
+        self.cprofile_frames = cprofile_frames
+        self.cprofile_output = cprofile_output
+        self.cprofile = None
+        if cprofile_frames > 0:
+            self.cprofile = cProfile.Profile()
+            self.cprofile.enable()
+
+    def add(self, phase, elapsed):
+        self.current[phase] += elapsed
+
+    def end_frame(self):
+        now = time.perf_counter()
+        elapsed = now - self.frame_start
+        self.current["simulate"] = max(0.0, elapsed - sum(self.current.values()))
+        for phase, value in self.current.items():
+            self.samples[phase].append(value)
+            self.current[phase] = 0.0
+        self.samples["frame"].append(elapsed)
+        self.frames += 1
+        self.frame_start = now
+
+        if self.cprofile is not None and self.frames >= self.cprofile_frames:
+            self.cprofile.disable()
+            self.cprofile.dump_stats(self.cprofile_output)
+            self.cprofile = None
+            logging.info(f"Wrote profile of {self.frames} frames to {self.cprofile_output}")
+
+    def report(self):
+        """
+        Summarize the recent frame timings, one line per phase followed by
+        the histogram of its samples.
+
+        :rtype: str
+        """
+        lines = [f"Frame profile: {self.frames} frames, last {len(self.samples['frame'])} shown (times in ms)"]
+        for phase, samples in self.samples.items():
+            if not samples:
+                continue
+            ordered = sorted(v * 1000.0 for v in samples)
+            n = len(ordered)
+            lines.append(f"{phase:>9}: mean={sum(ordered) / n:.2f} p50={ordered[n // 2]:.2f} p95={ordered[int(n * 0.95)]:.2f} max={ordered[-1]:.2f}")
+            counts = []
+            lower = 0
+            for upper in self.buckets + (float("inf"),):
+                count = sum(1 for v in ordered if lower <= v < upper)
+                if count:
+                    counts.append(f"<{upper:g}:{count}")
+                lower = upper
+            lines.append(f"{'':>11}{' '.join(counts)}")
+        return "\n".join(lines)
+
+    def dump(self, *args):
+        sys.stderr.write(self.report() + "\n")
+        sys.stderr.flush()
+
+    def instrument(self, device):
+        """
+        Install the timing hooks on the device, :py:class:`luma.core.render.canvas`
+        and ``time.sleep``, and arrange for the report to be written at exit
+        or when the process receives ``SIGUSR1``.
+        """
+        profiler = self
+
+        def display(image, _display=device.display):
+            start = time.perf_counter()
+            if profiler.exit_start is not None:
+                profiler.add("convert", start - profiler.exit_start)
+            _display(image)
+            profiler.add("transfer", time.perf_counter() - start)
+            profiler.end_frame()
+
+        device.display = display
+
+        canvas_enter = canvas.__enter__
+        canvas_exit = canvas.__exit__
+
+        def timed_enter(self):
+            profiler.draw_start = time.perf_counter()
+            return canvas_enter(self)
+
+        def timed_exit(self, *args):
+            profiler.exit_start = time.perf_counter()
+            if profiler.draw_start is not None:
+                profiler.add("draw", profiler.exit_start - profiler.draw_start)
+            try:
+                return canvas_exit(self, *args)
+            finally:
+                profiler.draw_start = profiler.exit_start = None
+
+        canvas.__enter__ = timed_enter
+        canvas.__exit__ = timed_exit
+
+        def timed_sleep(secs, _sleep=time.sleep):
+            start = time.perf_counter()
+            _sleep(secs)
+            profiler.add("sleep", time.perf_counter() - start)
+
+        time.sleep = luma.core.sprite_system.sleep = timed_sleep
+
+        atexit.register(self.dump)
+        if hasattr(signal, "SIGUSR1"):
+            signal.signal(signal.SIGUSR1, self.dump)
+
+        return device
+
+
+def supports_partial_update(device):
+    """
+    Whether :py:func:`partial_update` can be used to send just part of a frame
+    to the given device: currently only unrotated devices that use the stock
+    SSD1306 display routine (which includes the SSD1305, SSD1309, SSD1315 and
+    SSD1316).
+
+    :rtype: bool
+    """
+    return ssd1306 is not None and isinstance(device, ssd1306) and \
+        type(device).display is ssd1306.display and device.rotate == 0
+
+
+def partial_update(device, image, bounding_box):
+    """
+    Send only the region of a 1-bit image inside the bounding box to an
+    SSD1306-family device, widened vertically to whole 8-pixel pages.
+    """
+    left, top, right, bottom = bounding_box
+    top = top // 8
+    bottom = min(device._pages, (bottom + 7) // 8)
+
+    device.command(
+        device._const.COLUMNADDR, device._colstart + left, device._colstart + right - 1,
+        device._const.PAGEADDR, top, bottom - 1)
+
+    # Transposed & mirrored, each row holds one column of the region, bottom
+    # pixel first: so the bytes of that row are the column's pages in reverse
+    # order, each with its top pixel in the least significant bit.
+    region = image.crop((left, top * 8, right, bottom * 8))
+    rows = region.transpose(Image.Transpose.TRANSPOSE).transpose(Image.Transpose.FLIP_LEFT_RIGHT).tobytes()
+    pages = bottom - top
+    buf = [rows[x * pages + (pages - 1 - page)] for page in range(pages) for x in range(right - left)]
+    device.data(buf)
+
+
+# Number of rows in the display RAM of SSD1306-family devices
+RAM_ROWS = 64
+
+
+def supports_hardware_scroll(device):
+    """
+    Whether :py:func:`set_start_line` can be used to scroll the given device
+    vertically: SSD1306-family devices which :py:func:`partial_update`
+    supports, which show all of their display RAM (i.e. are 64 pixels high)
+    and whose ``display`` method has not been wrapped (e.g. by
+    ``--dirty-tracking`` or ``--profile``, which expect every frame to go
+    through it).
+
+    :rtype: bool
+    """
+    return supports_partial_update(device) and device.height == RAM_ROWS and \
+        "display" not in vars(device)
+
+
+def set_start_line(device, line):
+    """
+    Sets which row of an SSD1306-family device's display RAM is shown at the
+    top of the screen, the rest following on below it and wrapping around at
+    the end of the RAM.
+    """
+    device.command(device._const.SETSTARTLINE | line)
+
+
+def wire_bytes(device, bounding_box):
+    """
+    Estimates the number of bytes of pixel data it takes to send a region of a
+    frame to the device: monochrome devices are sent whole 8-pixel high pages,
+    greyscale ones 4 bits per pixel (as on the SSD1322) and colour ones 16 bits
+    per pixel (as on the ST7735).
+
+    :rtype: int
+    """
+    left, top, right, bottom = bounding_box
+    if device.mode == "1":
+        return (right - left) * ((bottom + 7) // 8 - top // 8)
+    bits = 4 if device.mode == "L" else 16
+    return ((right - left) * (bottom - top) * bits + 7) // 8
+
+
+class dirty_tracker(object):
+    """
+    Sits between the composed frame and the device, comparing each frame with
+    the previous one: identical frames are skipped entirely, and otherwise the
+    bounding boxes of the changes are calculated, one per segment. Where the
+    device supports it, only those regions are sent over the bus; other
+    devices are sent the full frame.
+
+    :param num_segments: The number of segments to split the frame into when
+        finding the changed regions; must be a square number (1, 4, 9, ...).
+    :type num_segments: int
+    """
+    def __init__(self, num_segments=4):
+        self.n = int(sqrt(num_segments))
+        assert num_segments >= 1 and num_segments == self.n ** 2
+        self.prev_image = None
+        self.frames = 0
+        self.skipped = 0
+        self.partial = 0
+
+    def changed_regions(self, image):
+        """
+        Calculates which parts of the image differ from the previous frame.
+
+        :param image: The frame about to be displayed.
+        :type image: PIL.Image.Image
+        :returns: The bounding box of the changes within each segment, or an
+            empty list if nothing changed.
+        :rtype: list
+        """
+        prev = self.prev_image
+        if prev is None or prev.size != image.size or prev.mode != image.mode:
+            return [(0, 0) + image.size]
+
+        diff = ImageChops.difference(prev, image)
+        if diff.getbbox() is None:
+            return []
+
+        width, height = image.size
+        segment_width = -(-width // self.n)
+        segment_height = -(-height // self.n)
+
+        regions = []
+        for y in range(0, height, segment_height):
+            for x in range(0, width, segment_width):
+                bbox = diff.crop((x, y, min(width, x + segment_width), min(height, y + segment_height))).getbbox()
+                if bbox is not None:
+                    regions.append((x + bbox[0], y + bbox[1], x + bbox[2], y + bbox[3]))
+        return regions
+
+    def instrument(self, device):
+        """
+        Route the device's ``display`` method through the tracker.
+        """
+        partial = supports_partial_update(device)
+        full_frame = (0, 0) + device.size
+
+        def display(image, _display=device.display):
+            self.frames += 1
+            regions = self.changed_regions(image)
+            if not regions:
+                self.skipped += 1
+                return
+
+            if partial and regions != [full_frame]:
+                self.partial += 1
+                for bounding_box in regions:
+                    partial_update(device, image, bounding_box)
+            else:
+                _display(image)
+
+            self.prev_image = image.copy()
+
+        device.display = display
+        return device
+
+
+class pipelined_device(object):
+    """
+    Wraps a device so that ``display`` returns as soon as the frame has been
+    queued, with the actual transfer to the device happening on a dedicated
+    thread: rendering the next frame then overlaps with sending the current
+    one. If frames are produced faster than the device can take them, the
+    stalest queued frame is dropped in favour of the newest.
+
+    Other attributes are delegated to the wrapped device; commands which
+    affect the display (``contrast``, ``show``, ``hide`` and ``cleanup``)
+    first wait for any queued frames to be sent.
+
+    :param device: The device to wrap.
+    :param max_queue: The maximum number of frames waiting to be sent.
+    :type max_queue: int
+    """
+    def __init__(self, device, max_queue=1):
+        self._device = device
+        self._frames = deque()
+        self._condition = threading.Condition()
+        self._busy = False
+        self._error = None
+        self.max_queue = max_queue
+        self.max_depth = 0
+        self.queued = 0
+        self.displayed = 0
+        self.dropped = 0
+
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        atexit.register(self.flush)
+
+    def __getattr__(self, attr):
+        return getattr(self._device, attr)
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._frames:
+                    self._busy = False
+                    self._condition.notify_all()
+                    self._condition.wait()
+                image = self._frames.popleft()
+                self._busy = True
+
+            try:
+                self._device.display(image)
+                self.displayed += 1
+            except Exception as e:
+                self._error = e
+
+    def display(self, image):
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+
+        image = image.copy()
+        with self._condition:
+            if len(self._frames) >= self.max_queue:
+                self._frames.popleft()
+                self.dropped += 1
+            self._frames.append(image)
+            self.queued += 1
+            self.max_depth = max(self.max_depth, len(self._frames))
+            self._condition.notify_all()
+
+    def clear(self):
+        self.display(Image.new(self.mode, self.size))
+
+    def flush(self):
+        """
+        Blocks until every queued frame has been sent to the device.
+        """
+        with self._condition:
+            while self._frames or self._busy:
+                self._condition.wait()
+
+    def contrast(self, level):
+        self.flush()
+        self._device.contrast(level)
+
+    def show(self):
+        self.flush()
+        self._device.show()
+
+    def hide(self):
+        self.flush()
+        self._device.hide()
+
+    def cleanup(self):
+        self.flush()
+        self._device.cleanup()
+
+    def stats(self):
+        """
+        Returns the current queue depth and frame counts.
+
+        :rtype: dict
+        """
+        return {
+            "queue_depth": len(self._frames),
+            "max_depth": self.max_depth,
+            "queued": self.queued,
+            "displayed": self.displayed,
+            "dropped": self.dropped,
+        }
+
+
 def get_device(actual_args=None):
     """
     Create device from command-line arguments and return it.
@@ -47,6 +468,19 @@ def get_device(actual_args=None):
     if actual_args is None:
         actual_args = sys.argv[1:]
     parser = cmdline.create_parser(description='luma.examples arguments')
+
+    profiling_group = parser.add_argument_group('Profiling')
+    profiling_group.add_argument('--profile', action='store_true', help='Time the phases of each frame, and report them at exit or on SIGUSR1.')
+    profiling_group.add_argument('--profile-history', type=int, default=1000, help='Number of recent frames to keep timings for.')
+    profiling_group.add_argument('--profile-frames', type=int, default=0, help='Run cProfile for this many frames (requires --profile).')
+    profiling_group.add_argument('--profile-output', type=str, default='profile.pstats', help='File to write the cProfile stats to.')
+
+    pipeline_group = parser.add_argument_group('Display pipeline')
+    pipeline_group.add_argument('--dirty-tracking', action='store_true', help='Skip frames identical to the previous one, and only send the changed regions to devices that support partial updates (SSD1306 family).')
+    pipeline_group.add_argument('--dirty-segments', type=int, default=4, help='Number of segments to find changed regions in (must be a square number).')
+    pipeline_group.add_argument('--pipeline', action='store_true', help='Send frames to the device on a background thread, overlapping rendering with the transfer.')
+    pipeline_group.add_argument('--pipeline-depth', type=int, default=1, help='Maximum number of frames queued for the device before the stalest is dropped.')
+
     args = parser.parse_args(actual_args)
 
     if args.config:
@@ -58,6 +492,18 @@ def get_device(actual_args=None):
     try:
         device = cmdline.create_device(args)
         print(display_settings(device, args))
+
+        if args.dirty_tracking:
+            dirty_tracker(args.dirty_segments).instrument(device)
+
+        if args.pipeline:
+            device = pipelined_device(device, args.pipeline_depth)
+            atexit.register(lambda: device.flush() or logging.info(f"Display pipeline: {device.stats()}"))
+
+        if args.profile:
+            profiler = frame_profiler(args.profile_history, args.profile_frames, args.profile_output)
+            profiler.instrument(device)
+
         return device
 
     except error.Error as e:
@@ -1,6 +1,6 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
-# Copyright (c) 2014-2023 Richard Hull and contributors
+# Copyright (c) 2014-2026 Richard Hull and contributors
 # See LICENSE.rst for details.
 # PYTHON_ARGCOMPLETE_OK
 
@@ -12,14 +12,17 @@ TTF glyphs.
 
 See: https://fontawesome.com/license for license details of included
 fontawesome-webfont.ttf file
+
+The glyphs are pre-rendered into an atlas on a background thread, which is
+saved for next time, so that each icon is simply pasted onto the screen.
 """
 
 import sys
 import random
 from pathlib import Path
-from PIL import ImageFont
 
 from demo_opts import get_device
+from glyph_atlas import glyph_atlas
 from luma.core.render import canvas
 from luma.core.sprite_system import framerate_regulator
 
@@ -124,11 +127,6 @@ codes = [
 ]
 
 
-def make_font(name, size):
-    font_path = str(Path(__file__).resolve().parent.joinpath('fonts', name))
-    return ImageFont.truetype(font_path, size)
-
-
 def infinite_shuffle(arr):
     copy = list(arr)
     while True:
@@ -140,7 +138,8 @@ def infinite_shuffle(arr):
 def main(num_iterations=sys.maxsize):
     device = get_device()
     regulator = framerate_regulator(fps=1)
-    font = make_font("fontawesome-webfont.ttf", device.height - 10)
+    font_path = Path(__file__).resolve().parent.joinpath('fonts', 'fontawesome-webfont.ttf')
+    atlas = glyph_atlas(font_path, device.height - 10, codes, mode="1" if device.mode == "1" else "L").warm_up()
 
     for code in infinite_shuffle(codes):
         with regulator:
@@ -148,12 +147,11 @@ def main(num_iterations=sys.maxsize):
             if num_iterations == 0:
                 break
 
+            tile, _ = atlas.get(code)
             with canvas(device) as draw:
-                left, top, right, bottom = draw.textbbox((0, 0), code, font)
-                w, h = right - left, bottom - top
-                left = (device.width - w) / 2
-                top = (device.height - h) / 2
-                draw.text((left, top), text=code, font=font, fill="white")
+                left = (device.width - tile.width) // 2
+                top = (device.height - tile.height) // 2
+                draw.bitmap((left, top), tile, fill="white")
 
 
 if __name__ == "__main__":
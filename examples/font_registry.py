@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2026 Richard Hull and contributors
+# See LICENSE.rst for details.
+
+"""
+Process-wide cache of the fonts used by the examples.
+"""
+
+import time
+import logging
+import threading
+from pathlib import Path
+from PIL import ImageFont
+
+
+FONT_DIR = Path(__file__).resolve().parent.joinpath("fonts")
+
+
+class font_registry(object):
+    """
+    Loads each font only once it is first asked for, and then keeps it,
+    keyed by its path, size, face index and layout engine.
+
+    Fonts are always loaded from their path, rather than from a file object
+    or bytes: FreeType then memory-maps the file, and the pages are shared
+    between all the sizes it is loaded at, whereas Pillow makes a private
+    copy of the font data for each size loaded from memory (which adds up for
+    fonts like code2000, which is several megabytes).
+    """
+    def __init__(self, font_dir=FONT_DIR):
+        self.font_dir = Path(font_dir)
+        # Fonts by the arguments they were asked for with, and by resolved
+        # path (so that different names for the same file share the font)
+        self._fonts = {}
+        self._loaded = {}
+        self._loading = {}
+        self._files = set()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.load_time = 0
+
+    def path(self, name):
+        """
+        Resolves the name of a font: relative names are looked for in the
+        examples' ``fonts`` directory.
+        """
+        return self.font_dir.joinpath(name).resolve()
+
+    def get(self, name, size, index=0, layout_engine=None):
+        """
+        Returns the font with the given file name (or path) and size, loading
+        it if need be.
+        """
+        key = (name, size, index, layout_engine)
+        font = self._fonts.get(key)
+        if font is not None:
+            with self._lock:
+                self.hits += 1
+            return font
+
+        # Only resolved (which touches the filesystem) the first time a name
+        # is asked for, and loaded holding a lock for just this font, so that
+        # looking up other fonts isn't held up
+        path = self.path(name)
+        loaded_key = (path, size, index, layout_engine)
+        with self._lock:
+            loading = self._loading.setdefault(loaded_key, threading.Lock())
+
+        with loading:
+            font = self._loaded.get(loaded_key)
+            if font is not None:
+                with self._lock:
+                    self.hits += 1
+            else:
+                start = time.perf_counter()
+                font = ImageFont.truetype(str(path), size, index=index, layout_engine=layout_engine)
+                elapsed = time.perf_counter() - start
+                logging.debug(f"Loaded {path.name} at size {size} in {elapsed * 1000:.2f} ms")
+
+                with self._lock:
+                    self._loaded[loaded_key] = font
+                    self._files.add(path)
+                    self.misses += 1
+                    self.load_time += elapsed
+
+        self._fonts[key] = font
+        return font
+
+    def stats(self):
+        """
+        Returns the number of fonts loaded, how often a font was found
+        already loaded, the total time spent loading fonts (in seconds) and
+        the total size of the (memory-mapped) font files, in bytes.
+        """
+        return {
+            "fonts": len(self._loaded),
+            "files": len(self._files),
+            "hits": self.hits,
+            "misses": self.misses,
+            "load_time": self.load_time,
+            "file_bytes": sum(path.stat().st_size for path in self._files),
+        }
+
+
+fonts = font_registry()
+
+
+def make_font(name, size):
+    return fonts.get(name, size)
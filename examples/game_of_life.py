@@ -13,9 +13,24 @@ http://codereview.stackexchange.com/a/108121
 
 import time
 from random import randint
+from PIL import Image
 from demo_opts import get_device
 from luma.core.render import canvas
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+# Which engine to run: "grid" keeps the board as a dense NumPy array, "set"
+# is the original set-of-cells implementation, kept as a reference.
+ENGINE = "grid"
+
+# When True, the grid engine wraps around at the edges of the display;
+# otherwise everything beyond the edges is treated as dead.
+TOROIDAL = True
+
 
 def neighbors(cell):
     x, y = cell
@@ -29,6 +44,9 @@ def neighbors(cell):
     yield x + 1, y + 1
 
 
+offsets = [(dy, dx) for dy in (-1, 0, 1) for dx in (-1, 0, 1) if dy or dx]
+
+
 def iterate(board):
     new_board = set([])
     candidates = board.union(set(n for cell in board for n in neighbors(cell)))
@@ -39,6 +57,45 @@ def iterate(board):
     return new_board
 
 
+def iterate_grid(grid, toroidal=True):
+    """
+    Advance a dense board (a 2D array of 0/1 cells) by one generation,
+    counting the neighbours of every cell at once with shifted adds.
+    """
+    if toroidal:
+        count = sum(np.roll(grid, (dy, dx), axis=(0, 1))
+                    for dy, dx in offsets)
+    else:
+        rows, cols = grid.shape
+        padded = np.pad(grid, 1)
+        count = sum(padded[1 + dy:1 + dy + rows, 1 + dx:1 + dx + cols]
+                    for dy, dx in offsets)
+    return ((count == 3) | ((count == 2) & (grid == 1))).astype(np.uint8)
+
+
+def to_grid(board, rows, cols):
+    grid = np.zeros((rows, cols), dtype=np.uint8)
+    for x, y in board:
+        if 0 <= x < cols and 0 <= y < rows:
+            grid[y, x] = 1
+    return grid
+
+
+def grid_image(grid, scale, frame):
+    """
+    Blit the board into the frame buffer in one go: each live cell becomes a
+    ``scale`` x ``scale`` block, with a black line along its top & left edges
+    to match the outlined rectangles of the set-based renderer.
+    """
+    rows, cols = grid.shape
+    cell = np.full((scale, scale), 255, dtype=np.uint8)
+    if scale > 1:
+        cell[0, :] = 0
+        cell[:, 0] = 0
+    frame[:rows * scale, :cols * scale] = np.kron(grid, cell)
+    return Image.fromarray(frame)
+
+
 def main():
     text = "Game of Life"
     scale = 3
@@ -46,20 +103,32 @@ def main():
     rows = device.height // scale
     initial_population = int(cols * rows * 0.33)
 
+    use_grid = ENGINE == "grid"
+    if use_grid and np is None:
+        print("The numpy library could not be found, falling back to the set-based engine. Install it using 'sudo -H pip install numpy'.")
+        use_grid = False
+
+    if use_grid:
+        frame = np.zeros((device.height, device.width), dtype=np.uint8)
+
     while True:
         board = set((randint(0, cols), randint(0, rows)) for _ in range(initial_population))
+        if use_grid:
+            board = to_grid(board, rows, cols)
 
         for i in range(500):
-            with canvas(device, dither=True) as draw:
-                for x, y in board:
-                    left = x * scale
-                    top = y * scale
-                    if scale == 1:
-                        draw.point((left, top), fill="white")
-                    else:
-                        right = left + scale
-                        bottom = top + scale
-                        draw.rectangle((left, top, right, bottom), fill="white", outline="black")
+            background = grid_image(board, scale, frame) if use_grid else None
+            with canvas(device, background=background, dither=True) as draw:
+                if not use_grid:
+                    for x, y in board:
+                        left = x * scale
+                        top = y * scale
+                        if scale == 1:
+                            draw.point((left, top), fill="white")
+                        else:
+                            right = left + scale
+                            bottom = top + scale
+                            draw.rectangle((left, top, right, bottom), fill="white", outline="black")
 
                 if i == 0:
                     left, top, right, bottom = draw.textbbox((0, 0), text)
@@ -73,7 +142,10 @@ def main():
             if i == 0:
                 time.sleep(3)
 
-            board = iterate(board)
+            if use_grid:
+                board = iterate_grid(board, TOROIDAL)
+            else:
+                board = iterate(board)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2026 Richard Hull and contributors
+# See LICENSE.rst for details.
+
+"""
+Pre-rendered glyphs (e.g. icons from an icon font), so that they can be
+drawn by pasting rather than being rasterised by FreeType each time.
+"""
+
+import os
+import json
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from PIL import Image, ImageDraw, PngImagePlugin
+from font_registry import make_font
+
+
+# Where atlases are saved between runs
+CACHE_DIR = Path(os.environ.get("XDG_CACHE_HOME", Path.home().joinpath(".cache"))).joinpath("luma.examples")
+
+# Width of the saved atlas image, into which the glyphs are packed in rows
+ATLAS_WIDTH = 1024
+
+# Changed whenever the way glyphs are rendered changes, so that atlases saved
+# by earlier versions are not used
+ATLAS_VERSION = 2
+
+
+class glyph_atlas(object):
+    """
+    Renders glyphs of a font as tight-fitting masks (1-bit or 8-bit
+    greyscale), on a background thread so that they are ready before they are
+    first needed, and keeps them packed into a single image on disk, keyed by
+    a hash of the font file, its size and the mode. Later runs load the atlas
+    from disk instead of rendering the glyphs again.
+
+    The atlas is not tied to any one example: anything that repeatedly draws
+    the same icons or characters (e.g. status icons) can use it.
+
+    :param font_path: The TrueType font file.
+    :param size: The size of the font, in points.
+    :type size: int
+    :param codes: The characters to render.
+    :param mode: The mode of the masks: "1" or "L".
+    :type mode: str
+    :param cache_dir: The directory to save the atlas in, or ``None`` to keep
+        it in memory only.
+    """
+    def __init__(self, font_path, size, codes, mode="L", cache_dir=CACHE_DIR):
+        self.font = make_font(Path(font_path).resolve(), size)
+        self.codes = list(codes)
+        self.mode = mode
+        self.glyphs = {}
+        self.rendered = 0
+        self._lock = threading.Lock()
+        self._thread = None
+        self._dirty = False
+
+        self.path = None
+        if cache_dir is not None:
+            with open(font_path, "rb") as f:
+                digest = hashlib.sha1(f.read()).hexdigest()[:16]
+            self.path = Path(cache_dir).joinpath(f"atlas-v{ATLAS_VERSION}-{digest}-{size}-{mode}.png")
+            self.load()
+
+    def render(self, code):
+        """
+        Renders a glyph as a mask just big enough for its ink, returning it
+        along with the offset of the ink from the text origin.
+        """
+        left, top, right, bottom = self.font.getbbox(code, mode=self.mode)
+        tile = Image.new(self.mode, (max(right - left, 1), max(bottom - top, 1)))
+        draw = ImageDraw.Draw(tile)
+        # 1-bit glyphs are rendered without anti-aliasing, as on a 1-bit
+        # canvas, rather than converted (and so dithered) from greyscale
+        draw.fontmode = "1" if self.mode == "1" else "L"
+        draw.text((-left, -top), code, font=self.font, fill=255)
+        return tile, (left, top)
+
+    def get(self, code):
+        """
+        Returns the mask of a glyph and the offset of its top left corner from
+        the text origin, rendering it now if it is not in the atlas yet.
+        """
+        glyph = self.glyphs.get(code)
+        if glyph is None:
+            with self._lock:
+                glyph = self.glyphs.get(code)
+                if glyph is None:
+                    glyph = self.glyphs[code] = self.render(code)
+                    self.rendered += 1
+                    self._dirty = True
+        return glyph
+
+    def warm_up(self):
+        """
+        Renders all the glyphs not yet in the atlas on a background thread,
+        saving the atlas once they are done.
+        """
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._warm_up, daemon=True)
+            self._thread.start()
+        return self
+
+    def _warm_up(self):
+        for code in self.codes:
+            self.get(code)
+        if self._dirty and self.path is not None:
+            self.save()
+
+    def wait(self, timeout=None):
+        """
+        Waits for the glyphs being rendered by :py:meth:`warm_up` to be done.
+        """
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def load(self):
+        try:
+            with Image.open(self.path) as atlas:
+                index = json.loads(atlas.text["glyphs"])
+                atlas.load()
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            logging.warning(f"Ignoring unreadable glyph atlas {self.path}: {e}")
+            return
+
+        for code, (x, y, w, h, left, top) in index.items():
+            self.glyphs[code] = (atlas.crop((x, y, x + w, y + h)), (left, top))
+
+    def save(self):
+        """
+        Packs the glyphs into rows of a single image and writes it out, along
+        with the position of each glyph in it.
+        """
+        with self._lock:
+            glyphs = dict(self.glyphs)
+            self._dirty = False
+
+        index = {}
+        x = y = row_height = 0
+        for code, (tile, offset) in sorted(glyphs.items(), key=lambda item: -item[1][0].height):
+            if x + tile.width > ATLAS_WIDTH:
+                x, y, row_height = 0, y + row_height, 0
+            index[code] = (x, y, tile.width, tile.height) + tuple(offset)
+            x += tile.width
+            row_height = max(row_height, tile.height)
+
+        atlas = Image.new(self.mode, (ATLAS_WIDTH, max(y + row_height, 1)))
+        for code, (tile, _) in glyphs.items():
+            atlas.paste(tile, index[code][:2])
+
+        info = PngImagePlugin.PngInfo()
+        info.add_text("glyphs", json.dumps(index))
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = self.path.with_suffix(f".{os.getpid()}.tmp")
+            atlas.save(temp_path, "PNG", pnginfo=info)
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            logging.warning(f"Could not save glyph atlas {self.path}: {e}")
+
+    def draw(self, draw, xy, code, fill="white"):
+        """
+        Draws a glyph as if with ``draw.text(xy, code, font=...)``.
+        """
+        tile, (left, top) = self.get(code)
+        draw.bitmap((xy[0] + left, xy[1] + top), tile, fill=fill)
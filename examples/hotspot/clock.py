@@ -6,7 +6,7 @@
 import math
 import datetime
 
-from hotspot.common import title_text, tiny_font
+from hotspot.common import title_text, draw_text
 
 
 def posn(angle, arm_length):
@@ -23,7 +23,7 @@ def digital(draw, width, height):
     current_time = now.strftime("%H:%m:%S")
 
     title_text(draw, margin, width, today_date)
-    draw.text((margin + 10, 20), text=current_time, fill="white", font=tiny_font)
+    draw_text(draw, (margin + 10, 20), current_time)
 
 
 def analog(draw, width, height):
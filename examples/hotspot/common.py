@@ -3,14 +3,121 @@
 # Copyright (c) 2014-2023 Richard Hull and contributors
 # See LICENSE.rst for details.
 
-from pathlib import Path
-from PIL import ImageFont
+import math
+import threading
+from collections import OrderedDict
+from PIL import Image, ImageDraw, ImageFont
+from font_registry import make_font
 
 
-tiny_font = ImageFont.truetype(
-    str(Path(__file__).resolve().parent.parent.joinpath("fonts", "FreePixel.ttf")),
-    10
-)
+_default_font = None
+
+
+def tiny_font():
+    return make_font("FreePixel.ttf", 10)
+
+
+def default_font():
+    """
+    What ``draw.getfont()`` returns when no font is set, loaded once on first
+    use: the draw object loads a new (and so differently keyed) copy every
+    time.
+    """
+    global _default_font
+    if _default_font is None:
+        _default_font = ImageFont.load_default()
+    return _default_font
+
+
+class text_cache(object):
+    """
+    LRU cache of rasterised strings, so that labels and values which are
+    drawn over and over again are pasted as pre-rendered bitmaps rather than
+    being run through FreeType on every refresh.
+
+    The cache may be used from several threads at once (luma renders the
+    hotspots of a viewport on a thread pool).
+
+    Rasters are keyed by font, text, font mode (as determined by the image
+    mode: 1-bit or anti-aliased) and sub-pixel start position. They are
+    stored as masks, so the fill colour is applied when pasting and need not
+    be part of the key. Text widths are cached alongside.
+
+    :param maxsize: The maximum number of rasters (and, separately, widths)
+        to hold before the least recently used are evicted.
+    :type maxsize: int
+    """
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._rasters = OrderedDict()
+        self._lengths = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _lookup(self, cache, key, create):
+        with self._lock:
+            value = cache.get(key)
+            if value is not None:
+                self.hits += 1
+                cache.move_to_end(key)
+                return value
+
+        # Rendered outside the lock, so that other threads aren't held up
+        value = create()
+        with self._lock:
+            self.misses += 1
+            cache[key] = value
+            cache.move_to_end(key)
+            if len(cache) > self.maxsize:
+                cache.popitem(last=False)
+        return value
+
+    @staticmethod
+    def _font(draw, font):
+        return font or draw.font or default_font()
+
+    def textlength(self, draw, text, font=None):
+        font = self._font(draw, font)
+        return self._lookup(self._lengths, (font, text, draw.fontmode),
+                            lambda: draw.textlength(text, font=font))
+
+    def _rasterise(self, text, font, fontmode, start):
+        fx, fy = start
+        left, top, right, bottom = ImageDraw.Draw(Image.new(fontmode, (1, 1))).textbbox(start, text, font=font)
+        pad = max(0, -math.floor(left), -math.floor(top))
+        mask = Image.new(fontmode, (math.ceil(right) + pad + 1, math.ceil(bottom) + pad + 1))
+        ImageDraw.Draw(mask).text((pad + fx, pad + fy), text, font=font, fill=255)
+
+        bbox = mask.getbbox()
+        if bbox is None:
+            return None, None
+        return mask.crop(bbox), (bbox[0] - pad, bbox[1] - pad)
+
+    def text(self, draw, xy, text, font=None, fill=None):
+        """
+        Equivalent to ``draw.text(xy, text, fill, font)`` for single lines of
+        text at non-negative coordinates (anything else is drawn directly).
+        """
+        x, y = xy
+        font = self._font(draw, font)
+        if x < 0 or y < 0 or "\n" in text:
+            draw.text(xy, text=text, font=font, fill=fill)
+            return
+
+        start = (math.modf(x)[0], math.modf(y)[0])
+        key = (font, text, draw.fontmode, start)
+        mask, offset = self._lookup(self._rasters, key,
+                                    lambda: self._rasterise(text, font, draw.fontmode, start))
+        if mask is not None:
+            draw.bitmap((int(x) + offset[0], int(y) + offset[1]), mask, fill=fill)
+
+
+raster_cache = text_cache()
+
+
+def draw_text(draw, xy, text, font=None, fill="white"):
+    raster_cache.text(draw, xy, text, font or tiny_font(), fill)
 
 
 def bytes2human(n, fmt="{0:0.2f}"):
@@ -34,10 +141,18 @@ def bytes2human(n, fmt="{0:0.2f}"):
 
 
 def right_text(draw, y, width, margin, text):
-    x = width - margin - draw.textlength(text, font=tiny_font)
-    draw.text((x, y), text=text, font=tiny_font, fill="white")
+    x = width - margin - raster_cache.textlength(draw, text, font=tiny_font())
+    draw_text(draw, (x, y), text)
+
+
+def waiting_text(draw, margin):
+    """
+    Drawn in place of the values until the metrics they come from have first
+    been sampled.
+    """
+    draw_text(draw, (margin, 20), "...")
 
 
 def title_text(draw, y, width, text):
-    x = (width - draw.textlength(text)) / 2
-    draw.text((x, y), text=text, fill="yellow")
+    x = (width - raster_cache.textlength(draw, text)) / 2
+    raster_cache.text(draw, (x, y), text, fill="yellow")
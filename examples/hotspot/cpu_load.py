@@ -4,9 +4,9 @@
 # See LICENSE.rst for details.
 
 import time
-import psutil
 from luma.core.virtual import hotspot
-from hotspot.common import title_text
+from hotspot.common import title_text, waiting_text
+from hotspot.metrics import metrics
 
 
 def vertical_bar(draw, x1, y1, x2, y2, yh):
@@ -15,11 +15,14 @@ def vertical_bar(draw, x1, y1, x2, y2, yh):
 
 
 def render(draw, width, height):
-    percentages = psutil.cpu_percent(interval=None, percpu=True)
-
     top_margin = 3
     bottom_margin = 3
     title_text(draw, top_margin, width, "CPU Load")
+    if not metrics.ready("cpu_percent"):
+        waiting_text(draw, top_margin)
+        return
+
+    percentages = metrics.value("cpu_percent")
 
     bar_height = height - 15 - top_margin - bottom_margin
     width_cpu = width / len(percentages)
@@ -3,19 +3,23 @@
 # Copyright (c) 2014-18 Richard Hull and contributors
 # See LICENSE.rst for details.
 
-import psutil
-from hotspot.common import bytes2human, right_text, title_text, tiny_font
+from hotspot.common import bytes2human, right_text, title_text, draw_text, waiting_text
+from hotspot.metrics import metrics
 
 
 def render(draw, width, height):
-    df = psutil.disk_usage("/")
-
     margin = 3
 
     title_text(draw, margin, width, text="Disk")
-    draw.text((margin, 20), text="Used:", font=tiny_font, fill="white")
-    draw.text((margin, 35), text="Free:", font=tiny_font, fill="white")
-    draw.text((margin, 45), text="Total:", font=tiny_font, fill="white")
+    if not metrics.ready("disk_usage"):
+        waiting_text(draw, margin)
+        return
+
+    df = metrics.value("disk_usage")
+
+    draw_text(draw, (margin, 20), "Used:")
+    draw_text(draw, (margin, 35), "Free:")
+    draw_text(draw, (margin, 45), "Total:")
 
     right_text(draw, 20, width, margin, text="{0:0.1f}%".format(df.percent))
     right_text(draw, 35, width, margin, text=bytes2human(df.free, "{0:0.0f}"))
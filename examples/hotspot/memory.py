@@ -3,21 +3,25 @@
 # Copyright (c) 2014-18 Richard Hull and contributors
 # See LICENSE.rst for details.
 
-import psutil
-from hotspot.common import bytes2human, right_text, title_text, tiny_font
+from hotspot.common import bytes2human, right_text, title_text, draw_text, waiting_text
+from hotspot.metrics import metrics
 
 
 def render(draw, width, height):
-    mem = psutil.virtual_memory()
-    swap = psutil.swap_memory()
-    mem_used_pct = (mem.total - mem.available) * 100.0 / mem.total
-
     margin = 3
 
     title_text(draw, margin, width, text="Memory")
-    draw.text((margin, 20), text="Used:", font=tiny_font, fill="white")
-    draw.text((margin, 35), text="Phys:", font=tiny_font, fill="white")
-    draw.text((margin, 45), text="Swap:", font=tiny_font, fill="white")
+    if not metrics.ready("virtual_memory", "swap_memory"):
+        waiting_text(draw, margin)
+        return
+
+    mem = metrics.value("virtual_memory")
+    swap = metrics.value("swap_memory")
+    mem_used_pct = (mem.total - mem.available) * 100.0 / mem.total
+
+    draw_text(draw, (margin, 20), "Used:")
+    draw_text(draw, (margin, 35), "Phys:")
+    draw_text(draw, (margin, 45), "Swap:")
 
     right_text(draw, 20, width, margin, text="{0:0.1f}%".format(mem_used_pct))
     right_text(draw, 35, width, margin, text=bytes2human(mem.used))
@@ -0,0 +1,148 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2026 Richard Hull and contributors
+# See LICENSE.rst for details.
+
+import time
+import logging
+import threading
+from collections import namedtuple
+
+import psutil
+
+
+class sample(namedtuple("sample", ["value", "timestamp", "cost"])):
+    """
+    An immutable snapshot of a metric: the value returned by the sampling
+    function, the time (``time.time()``) it was taken at and how long the
+    sampling took, in seconds.
+    """
+    __slots__ = ()
+
+    @property
+    def age(self):
+        """
+        How stale the snapshot is, in seconds.
+        """
+        return time.time() - self.timestamp
+
+
+class collector(threading.Thread):
+    """
+    Samples metrics in the background, each on its own thread and at its own
+    interval, so that slow calls (e.g. ``disk_usage`` on a stalled network
+    mount) never hold up rendering, nor the sampling of the other metrics.
+    The hotspot widgets read the latest snapshot with :py:meth:`get`, which
+    returns ``None`` until the first sample of a metric has been taken.
+
+    If the collector has not been started, :py:meth:`get` samples the metric
+    on the calling thread instead, whenever the last snapshot is older than
+    its interval (as it also does for the very first sample).
+    """
+    def __init__(self):
+        super(collector, self).__init__(daemon=True)
+        self._metrics = {}
+        self._snapshots = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._terminated = False
+
+    def register(self, name, fn, interval):
+        """
+        Add a metric to be sampled every ``interval`` seconds by calling ``fn``.
+        """
+        with self._lock:
+            self._metrics[name] = (fn, interval)
+        self._wakeup.set()
+
+    def _sample(self, name):
+        fn, interval = self._metrics[name]
+        start = time.perf_counter()
+        try:
+            value = fn()
+        except Exception as e:
+            logging.warning(f"Failed to sample {name}: {e}")
+            return self._snapshots.get(name)
+
+        snapshot = sample(value, time.time(), time.perf_counter() - start)
+        self._snapshots[name] = snapshot
+        return snapshot
+
+    def get(self, name):
+        """
+        Returns the latest :py:class:`sample` of the metric, or ``None`` if it
+        has not been sampled successfully yet.
+        """
+        snapshot = self._snapshots.get(name)
+        if not self.is_alive() and (snapshot is None or snapshot.age >= self._metrics[name][1]):
+            snapshot = self._sample(name)
+        return snapshot
+
+    def ready(self, *names):
+        """
+        Whether all of the metrics have been sampled (and so :py:meth:`value`
+        can be called for them without raising).
+        """
+        return all(self.get(name) is not None for name in names)
+
+    def value(self, name):
+        """
+        Returns the latest value of the metric.
+
+        :raises KeyError: if the metric has never been sampled successfully.
+        """
+        snapshot = self.get(name)
+        if snapshot is None:
+            raise KeyError(name)
+        return snapshot.value
+
+    def stats(self):
+        """
+        Returns the age and sampling cost (both in seconds) of every metric
+        that has been sampled, keyed by name.
+        """
+        return {name: {"age": snapshot.age, "cost": snapshot.cost}
+                for name, snapshot in self._snapshots.items()}
+
+    def start(self):
+        if not self.is_alive():
+            super(collector, self).start()
+
+    def stop(self):
+        self._terminated = True
+        self._wakeup.set()
+        self._stopped.set()
+
+    def _worker(self, name):
+        interval = self._metrics[name][1]
+        due = time.monotonic()
+        while not self._terminated:
+            self._sample(name)
+            # don't try to catch up on missed samples if sampling is slow
+            due = max(due + interval, time.monotonic())
+            self._stopped.wait(due - time.monotonic())
+
+    def run(self):
+        # Starts a sampling thread for each metric, including those
+        # registered later on
+        started = set()
+        while not self._terminated:
+            with self._lock:
+                names = self._metrics.keys() - started
+            for name in names:
+                threading.Thread(target=self._worker, args=(name,), name=f"metrics-{name}", daemon=True).start()
+                started.add(name)
+
+            self._wakeup.wait()
+            self._wakeup.clear()
+
+
+metrics = collector()
+metrics.register("cpu_percent", lambda: psutil.cpu_percent(interval=None, percpu=True), 0.5)
+metrics.register("virtual_memory", psutil.virtual_memory, 2.0)
+metrics.register("swap_memory", psutil.swap_memory, 2.0)
+metrics.register("disk_usage", lambda: psutil.disk_usage("/"), 2.0)
+metrics.register("net_if_addrs", psutil.net_if_addrs, 10.0)
+metrics.register("net_io_counters", lambda: psutil.net_io_counters(pernic=True), 2.0)
+metrics.register("boot_time", psutil.boot_time, 60.0)
@@ -3,8 +3,8 @@
 # Copyright (c) 2014-18 Richard Hull and contributors
 # See LICENSE.rst for details.
 
-import psutil
-from hotspot.common import bytes2human, right_text, title_text, tiny_font
+from hotspot.common import bytes2human, right_text, title_text, draw_text, waiting_text
+from hotspot.metrics import metrics
 
 
 def stats(interface):
@@ -12,17 +12,21 @@ def stats(interface):
     def render(draw, width, height):
         margin = 3
         title_text(draw, margin, width, text="Net:{0}".format(interface))
+        if not metrics.ready("net_if_addrs", "net_io_counters"):
+            waiting_text(draw, margin)
+            return
+
         try:
-            address = psutil.net_if_addrs()[interface][0].address
-            counters = psutil.net_io_counters(pernic=True)[interface]
+            address = metrics.value("net_if_addrs")[interface][0].address
+            counters = metrics.value("net_io_counters")[interface]
 
-            draw.text((margin, 20), text=address, font=tiny_font, fill="white")
-            draw.text((margin, 35), text="Rx:", font=tiny_font, fill="white")
-            draw.text((margin, 45), text="Tx:", font=tiny_font, fill="white")
+            draw_text(draw, (margin, 20), address)
+            draw_text(draw, (margin, 35), "Rx:")
+            draw_text(draw, (margin, 45), "Tx:")
 
             right_text(draw, 35, width, margin, text=bytes2human(counters.bytes_recv))
             right_text(draw, 45, width, margin, text=bytes2human(counters.bytes_sent))
         except:
-            draw.text((margin, 20), text="n/a", font=tiny_font, fill="white")
+            draw_text(draw, (margin, 20), "n/a")
 
     return render
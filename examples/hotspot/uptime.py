@@ -4,13 +4,17 @@
 # See LICENSE.rst for details.
 
 from datetime import datetime
-import psutil
-from hotspot.common import title_text, right_text
+from hotspot.common import title_text, right_text, waiting_text
+from hotspot.metrics import metrics
 
 
 def render(draw, width, height):
-    boot_time = datetime.fromtimestamp(psutil.boot_time())
-    elapsed = datetime.now() - boot_time
     margin = 3
     title_text(draw, margin, width, "Uptime")
+    if not metrics.ready("boot_time"):
+        waiting_text(draw, margin)
+        return
+
+    boot_time = datetime.fromtimestamp(metrics.value("boot_time"))
+    elapsed = datetime.now() - boot_time
     right_text(draw, 20, width, margin, text=f"{int(elapsed.total_seconds())} s")
@@ -1,20 +1,40 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
-# Copyright (c) 2014-2023 Richard Hull and contributors
+# Copyright (c) 2014-2026 Richard Hull and contributors
 # See LICENSE.rst for details.
 # PYTHON_ARGCOMPLETE_OK
 
 """
 Scrolling artist + song and play/pause indicator
+
+Only the layers which have moved since the last frame are composed again,
+and nothing is sent to the device while neither of them is moving. The
+scrollers are woken by a scheduler only when their next step is due, and
+scroll at a set speed in pixels per second, however busy the machine is.
 """
 
 import time
-from pathlib import Path
-from PIL import ImageFont, Image, ImageDraw
+import heapq
+from collections import defaultdict
+from PIL import Image, ImageDraw
 from demo_opts import get_device
+from font_registry import make_font
 from luma.core.render import canvas
+from luma.core.sprite_system import framerate_regulator
 from luma.core.image_composition import ImageComposition, ComposableImage
 
+
+# Only re-compose the layers that moved, rather than every layer every frame
+LAZY_COMPOSITION = True
+
+FPS = 40
+
+# Pause before scrolling and before rewinding, in seconds
+SCROLL_DELAY = 2.5
+
+# Pixels per second
+SCROLL_SPEED = 40
+
 titles = [
     ("Bridge over troubled water", "Simon & Garfunkel"),
     ("Up", "R.E.M."),
@@ -23,35 +43,202 @@ titles = [
 ]
 
 
-class TextImage():
-    def __init__(self, device, text, font):
-        with canvas(device) as draw:
-            left, top, right, bottom = draw.textbbox((0, 0), text, font)
-            w, h = right - left, bottom - top
+class ImagePool():
+    """
+    Keeps images which are no longer needed, so that later ones of the same
+    mode and size can reuse them rather than being allocated afresh.
+    """
+    def __init__(self):
+        self._free = defaultdict(list)
+        self.allocated = 0
+        self.reused = 0
+
+    def acquire(self, mode, size):
+        """
+        Returns a blank image, reusing a released one if there is one.
+        """
+        free = self._free.get((mode, size))
+        if free:
+            self.reused += 1
+            image = free.pop()
+            image.paste(0, (0, 0) + size)
+            return image
+
+        self.allocated += 1
+        return Image.new(mode, size)
+
+    def release(self, image):
+        self._free[(image.mode, image.size)].append(image)
 
-        self.image = Image.new(device.mode, (w, h))
+
+class TextImage():
+    def __init__(self, device, text, font, pool=None):
+        left, top, right, bottom = font.getbbox(text)
+        w, h = right - left, bottom - top
+
+        self.pool = pool
+        if pool is None:
+            self.image = Image.new(device.mode, (w, h))
+        else:
+            self.image = pool.acquire(device.mode, (w, h))
         draw = ImageDraw.Draw(self.image)
         draw.text((0, 0), text, font=font, fill="white")
         del draw
         self.width = w
         self.height = h
 
+    def release(self):
+        """
+        Returns the image to the pool it came from, once it is no longer
+        displayed.
+        """
+        if self.pool is not None:
+            self.pool.release(self.image)
+            self.image = None
+
+
+class LazyComposition(ImageComposition):
+    """
+    An :py:class:`ImageComposition` which remembers where each image was
+    placed, and what part of it was shown, when it was last composed: on
+    refresh, only the rectangles of the images which have moved (or been
+    added or removed) are cleared and composed again.
+    """
+    def __init__(self, device):
+        super(LazyComposition, self).__init__(device)
+        self._placed = {}
+        self._vacated = []
+
+    def _box(self, img):
+        width, height = self._device.size
+        left, top = img.position
+        right = min(width, left + min(width, img.width))
+        bottom = min(height, top + min(height, img.height))
+        return (left, top, right, bottom)
+
+    def remove_image(self, image):
+        super(LazyComposition, self).remove_image(image)
+        placed = self._placed.pop(image, None)
+        if placed is not None:
+            self._vacated.append(placed[0])
+
+    def refresh(self):
+        """
+        Composes the images which have moved since the last refresh.
+
+        :returns: The rectangles of the composition which changed.
+        :rtype: list
+        """
+        dirty, self._vacated = self._vacated, []
+        for img in self.composed_images:
+            placed = (self._box(img), img.offset)
+            previous = self._placed.get(img)
+            if placed != previous:
+                self._placed[img] = placed
+                dirty.append(placed[0])
+                if previous is not None:
+                    dirty.append(previous[0])
+
+        if dirty:
+            draw = ImageDraw.Draw(self._background_image)
+            for box in dirty:
+                draw.rectangle((box[0], box[1], box[2] - 1, box[3] - 1), fill="black")
+            del draw
+
+            # Re-compose, in order, the parts of all the images falling
+            # within the changed rectangles
+            for img in self.composed_images:
+                left, top, right, bottom = self._placed[img][0]
+                image = None
+                for box in dirty:
+                    overlap = (max(left, box[0]), max(top, box[1]), min(right, box[2]), min(bottom, box[3]))
+                    if overlap[0] < overlap[2] and overlap[1] < overlap[3]:
+                        if image is None:
+                            image = img.image(self._device.size)
+                        region = image.crop((overlap[0] - left, overlap[1] - top, overlap[2] - left, overlap[3] - top))
+                        self._background_image.paste(region, overlap[:2])
+
+        return dirty
+
 
 class Synchroniser():
+    """
+    A barrier: counts the tasks which are busy, and once the last of them is
+    ready, releases the tasks waiting on it all together.
+    """
     def __init__(self):
         self.synchronised = {}
+        self.pending = 0
+        self.waiting = []
 
     def busy(self, task):
+        if self.synchronised.get(id(task), True):
+            self.pending += 1
         self.synchronised[id(task)] = False
 
-    def ready(self, task):
+    def ready(self, task, callback=None):
+        """
+        Marks the task as ready, calling ``callback`` (if given) once all the
+        tasks are.
+        """
+        if self.synchronised.get(id(task)) is False:
+            self.pending -= 1
         self.synchronised[id(task)] = True
 
+        if callback is not None:
+            self.waiting.append(callback)
+        if self.pending == 0:
+            waiting, self.waiting = self.waiting, []
+            for callback in waiting:
+                callback()
+
     def is_synchronised(self):
-        for task in self.synchronised.items():
-            if task[1] is False:
-                return False
-        return True
+        return self.pending == 0
+
+
+class Scheduler():
+    """
+    Keeps a heap of when each task is next due, so that only the tasks whose
+    time has come are woken, however many tasks there are. A woken task's
+    ``wake`` method returns when it is next due, or ``None`` if it is waiting
+    for something else to schedule it again.
+    """
+    def __init__(self):
+        self.timers = []
+        self.count = 0
+        self.now = time.perf_counter()
+
+    def schedule(self, task, due):
+        # The count keeps tasks due at the same time in the order scheduled
+        heapq.heappush(self.timers, (due, self.count, task))
+        self.count += 1
+
+    def next_due(self):
+        return self.timers[0][0] if self.timers else None
+
+    def run_due(self, now):
+        """
+        Wakes the tasks which are due by ``now``, returning how many were.
+        """
+        self.now = now
+        woken = 0
+        while self.timers and self.timers[0][0] <= now:
+            _, _, task = heapq.heappop(self.timers)
+            due = task.wake(now)
+            if due is not None:
+                self.schedule(task, due)
+            woken += 1
+        return woken
+
+    def wait(self):
+        """
+        Sleeps until the next task is due.
+        """
+        due = self.next_due()
+        if due is not None:
+            delay = due - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
 
 
 class Scroller():
@@ -60,73 +247,84 @@ class Scroller():
     WAIT_REWIND = 3
     WAIT_SYNC = 4
 
-    def __init__(self, image_composition, rendered_image, scroll_delay, synchroniser):
+    def __init__(self, image_composition, rendered_image, scroll_delay, synchroniser, scheduler, speed=SCROLL_SPEED):
+        """
+        :param scroll_delay: How long to wait before scrolling, and before
+            rewinding, in seconds.
+        :param speed: The scrolling speed, in pixels per second.
+        """
         self.image_composition = image_composition
-        self.speed = 1
+        self.speed = speed
         self.image_x_pos = 0
         self.rendered_image = rendered_image
         self.image_composition.add_image(rendered_image)
         self.max_pos = rendered_image.width - image_composition().width
         self.delay = scroll_delay
-        self.ticks = 0
+        self.scroll_start = None
+        self.due_pos = 0
         self.state = self.WAIT_SCROLL
         self.synchroniser = synchroniser
+        self.scheduler = scheduler
         self.render()
         self.synchroniser.busy(self)
         self.cycles = 0
         self.must_scroll = self.max_pos > 0
+        self.scheduler.schedule(self, self.scheduler.now + self.delay)
 
-    def __del__(self):
+    def close(self):
         self.image_composition.remove_image(self.rendered_image)
 
-    def tick(self):
-
+    def wake(self, now):
+        """
+        Makes the state transition, or the scrolling step, which is due,
+        returning when the next one will be (or ``None`` when waiting for the
+        other scrollers).
+        """
         # Repeats the following sequence:
         #  wait - scroll - wait - rewind -> sync with other scrollers -> wait
         if self.state == self.WAIT_SCROLL:
-            if not self.is_waiting():
-                self.cycles += 1
-                self.state = self.SCROLLING
-                self.synchroniser.busy(self)
-
-        elif self.state == self.WAIT_REWIND:
-            if not self.is_waiting():
-                self.synchroniser.ready(self)
-                self.state = self.WAIT_SYNC
-
-        elif self.state == self.WAIT_SYNC:
-            if self.synchroniser.is_synchronised():
-                if self.must_scroll:
-                    self.image_x_pos = 0
+            self.cycles += 1
+            self.state = self.SCROLLING
+            self.synchroniser.busy(self)
+            self.scroll_start = now
+            self.due_pos = 0
+
+        if self.state == self.SCROLLING:
+            # The position follows the time since scrolling started, so the
+            # speed holds however late this is woken (but is at least the
+            # position it was woken for, whatever the rounding)
+            if self.must_scroll:
+                x_pos = min(self.max_pos, max(self.due_pos, int((now - self.scroll_start) * self.speed)))
+                if x_pos != self.image_x_pos:
+                    self.image_x_pos = x_pos
                     self.render()
-                self.state = self.WAIT_SCROLL
 
-        elif self.state == self.SCROLLING:
             if self.image_x_pos < self.max_pos:
-                if self.must_scroll:
-                    self.render()
-                    self.image_x_pos += self.speed
-            else:
-                self.state = self.WAIT_REWIND
+                self.due_pos = self.image_x_pos + 1
+                return self.scroll_start + self.due_pos / self.speed
+
+            self.state = self.WAIT_REWIND
+            return now + self.delay
+
+        if self.state == self.WAIT_REWIND:
+            self.state = self.WAIT_SYNC
+            self.synchroniser.ready(self, self.rewind)
+        return None
+
+    def rewind(self):
+        if self.must_scroll:
+            self.image_x_pos = 0
+            self.render()
+        self.state = self.WAIT_SCROLL
+        self.scheduler.schedule(self, self.scheduler.now + self.delay)
 
     def render(self):
         self.rendered_image.offset = (self.image_x_pos, 0)
 
-    def is_waiting(self):
-        self.ticks += 1
-        if self.ticks > self.delay:
-            self.ticks = 0
-            return False
-        return True
-
     def get_cycles(self):
         return self.cycles
 
 
-def make_font(name, size):
-    font_path = str(Path(__file__).resolve().parent.joinpath('fonts', name))
-    return ImageFont.truetype(font_path, size)
-
 # ------- main
 
 
@@ -137,30 +335,44 @@ if device.height >= 16:
 else:
     font = make_font("pixelmix.ttf", 8)
 
-image_composition = ImageComposition(device)
+if LAZY_COMPOSITION:
+    image_composition = LazyComposition(device)
+else:
+    image_composition = ImageComposition(device)
+
+pool = ImagePool()
+regulator = framerate_regulator(fps=FPS)
 
 try:
     while True:
         for title in titles:
             synchroniser = Synchroniser()
-            ci_song = ComposableImage(TextImage(device, title[0], font).image, position=(0, 1))
-            ci_artist = ComposableImage(TextImage(device, title[1], font).image, position=(0, 30))
-            song = Scroller(image_composition, ci_song, 100, synchroniser)
-            artist = Scroller(image_composition, ci_artist, 100, synchroniser)
-            cycles = 0
-
-            while cycles < 3:
-                artist.tick()
-                song.tick()
-                time.sleep(0.025)
-                cycles = song.get_cycles()
-
-                with canvas(device, background=image_composition()) as draw:
-                    image_composition.refresh()
-                    draw.rectangle(device.bounding_box, outline="white")
-
-            del artist
-            del song
+            scheduler = Scheduler()
+            song_text = TextImage(device, title[0], font, pool)
+            artist_text = TextImage(device, title[1], font, pool)
+            ci_song = ComposableImage(song_text.image, position=(0, 1))
+            ci_artist = ComposableImage(artist_text.image, position=(0, 30))
+            song = Scroller(image_composition, ci_song, SCROLL_DELAY, synchroniser, scheduler)
+            artist = Scroller(image_composition, ci_artist, SCROLL_DELAY, synchroniser, scheduler)
+
+            while song.get_cycles() < 3:
+                with regulator:
+                    scheduler.run_due(time.perf_counter())
+
+                    # The lazy composition reports what changed, so frames
+                    # where nothing moved needn't be sent
+                    changed = image_composition.refresh()
+                    if changed or not LAZY_COMPOSITION:
+                        with canvas(device, background=image_composition()) as draw:
+                            draw.rectangle(device.bounding_box, outline="white")
+
+                # Nothing changes until the next scroller is due
+                scheduler.wait()
+
+            artist.close()
+            song.close()
+            artist_text.release()
+            song_text.release()
 
 except KeyboardInterrupt:
     pass
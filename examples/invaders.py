@@ -1,6 +1,6 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
-# Copyright (c) 2014-2022 Richard Hull and contributors
+# Copyright (c) 2014-2026 Richard Hull and contributors
 # See LICENSE.rst for details.
 # PYTHON_ARGCOMPLETE_OK
 
@@ -27,16 +27,122 @@ alien3 = [0xFC, 0x98, 0x35, 0x7E, 0x7E, 0x35, 0x98, 0xFC]
 ARMY_SIZE_ROWS = 2
 ARMY_SIZE_COLS = 6
 
+# Number of updates each frame of the invaders' animation is shown for
+ANIMATION_PERIOD = 8
+
+# Number of bullets the player and the invaders can each have in flight
+PLAYER_BULLETS = 4
+ENEMY_BULLETS = 2
+
+# Chance of an invader firing on each update
+ENEMY_FIRE_CHANCE = 0.1
+
+PLAYER_LIVES = 3
+
+# Size of the cells in the spatial index of the invaders, which should be at
+# least as big as the distance a bullet can hit an invader from
+GRID_CELL_SIZE = 12
+
+
+class sprite(object):
+    """
+    A bitmap sprite, given (like ``arrow`` and the aliens above) as a list of
+    bytes, one per column, with the least significant bit at the top. Each
+    frame is converted into a 1-bit mask just once, and drawn with a single
+    call to :py:meth:`PIL.ImageDraw.ImageDraw.bitmap`.
+
+    :param frames: The animation frames, each a list of column bytes.
+    :param height: The number of rows (bits) of each column to use.
+    :type height: int
+    :param fill: The colour to draw the sprite in.
+    :param origin: The position within the sprite which is placed at the
+        coordinates given to :py:meth:`render`.
+    :type origin: tuple
+    """
+    masks = {}
+
+    def __init__(self, frames, height, fill, origin=(0, 0)):
+        self.frames = [self.mask(columns, height) for columns in frames]
+        self.fill = fill
+        self.origin = origin
+
+    @classmethod
+    def mask(cls, columns, height):
+        """
+        Returns the 1-bit mask for a list of column bytes, shared between all
+        sprites using the same bitmap.
+        """
+        key = (tuple(columns), height)
+        if key not in cls.masks:
+            image = Image.new("1", (len(columns), height))
+            image.putdata([(columns[x] >> y) & 0x1 for y in range(height) for x in range(len(columns))])
+            cls.masks[key] = image
+        return cls.masks[key]
+
+    def render(self, draw, x, y, frame=0):
+        mask = self.frames[frame % len(self.frames)]
+        draw.bitmap((x - self.origin[0], y - self.origin[1]), mask, fill=self.fill)
+
+
+class spatial_grid(object):
+    """
+    Uniform grid spatial index, so that the objects near a point can be
+    found without checking every object. Objects need ``x`` and ``y``
+    attributes, and must be :py:meth:`move`-d whenever these change.
+
+    :param cell_size: The width and height of each cell of the grid.
+    :type cell_size: int
+    """
+    def __init__(self, cell_size=GRID_CELL_SIZE):
+        self.cell_size = cell_size
+        self.cells = {}
+        self.locations = {}
+
+    def cell(self, x, y):
+        return (x // self.cell_size, y // self.cell_size)
+
+    def insert(self, obj):
+        key = self.cell(obj.x, obj.y)
+        self.cells.setdefault(key, set()).add(obj)
+        self.locations[obj] = key
+
+    def remove(self, obj):
+        key = self.locations.pop(obj)
+        cell = self.cells[key]
+        cell.discard(obj)
+        if not cell:
+            del self.cells[key]
+
+    def move(self, obj):
+        """
+        Updates the index for an object's new position (which only costs
+        anything when it has moved into another cell).
+        """
+        if self.locations[obj] != self.cell(obj.x, obj.y):
+            self.remove(obj)
+            self.insert(obj)
+
+    def near(self, x, y):
+        """
+        Yields the objects in the cell containing the given point and in the
+        surrounding cells, i.e. every object within ``cell_size`` of it.
+        """
+        cx, cy = self.cell(x, y)
+        for i in range(cx - 1, cx + 2):
+            for j in range(cy - 1, cy + 2):
+                yield from self.cells.get((i, j), ())
+
 
 class bullet(object):
-    def __init__(self, x, y):
+    def __init__(self, x, y, fill="white"):
         self.x = x
         self.y = y
+        self.fill = fill
         self.alive = False
 
     def render(self, draw):
         if self.alive:
-            draw.line((self.x, self.y, self.x, self.y + 2), fill="white")
+            draw.line((self.x, self.y, self.x, self.y + 2), fill=self.fill)
 
     def reset(self, x, y):
         self.x = x
@@ -47,23 +153,19 @@ class bullet(object):
     def update(self, direction):
         if self.alive:
             self.y = self.y + (direction * 4)
-            if self.y < 10:
+            if self.y < 10 or self.y > 60:
                 self.alive = False
 
 
 class player(object):
-    def __init__(self):
+    def __init__(self, bullets=PLAYER_BULLETS, lives=PLAYER_LIVES):
         self.x = 48
         self.y = 54
-        self.bullets = [bullet(0, 0) for _ in range(4)]
+        self.lives = lives
+        self.bullets = [bullet(0, 0) for _ in range(bullets)]
 
     def render(self, draw):
-        for i in range(len(arrow)):
-            line = arrow[i]
-            for j in range(3):
-                if line & 0x1:
-                    draw.point((self.x - 2 + i, self.y + j), fill="white")
-                line >>= 1
+        player_sprite.render(draw, self.x, self.y)
 
         for bullet in self.bullets:
             bullet.render(draw)
@@ -81,6 +183,16 @@ class player(object):
                 bullet.reset(self.x, self.y)
                 break
 
+    def hit(self, bullet):
+        """
+        Checks whether an enemy bullet has hit the player, losing a life if so.
+        """
+        if self.x - 2 <= bullet.x <= self.x + 2 and self.y <= bullet.y + 2 and bullet.y <= self.y + 2:
+            bullet.alive = False
+            self.lives -= 1
+            return True
+        return False
+
 
 class invader(object):
     def __init__(self, minx, maxx, x, y):
@@ -91,20 +203,17 @@ class invader(object):
         self.score = 10
         self._minx = minx
         self._maxx = maxx
+        self._steps = 0
         return
 
     def render(self, draw):
         if self.alive:
-            for i in range(len(alien2)):
-                line = alien2[i]
-                for j in range(8):
-                    if line & 0x1:
-                        draw.point((self.x - 4 + i, self.y - 4 + j), "green")
-                    line >>= 1
+            invader_sprite.render(draw, self.x, self.y, self._steps // ANIMATION_PERIOD)
 
     def update(self):
         invaded = False
         if self.alive:
+            self._steps += 1
             t = self.x + self._direction
             if t > self._minx and t < self._maxx:
                 self.x = self.x + self._direction
@@ -117,49 +226,76 @@ class invader(object):
 
 
 class army(object):
-    def __init__(self):
+    def __init__(self, rows=ARMY_SIZE_ROWS, cols=ARMY_SIZE_COLS, bullets=ENEMY_BULLETS):
         self.invaded = False
         self.invaders = []
-        for i in range(ARMY_SIZE_ROWS):
-            for j in range(ARMY_SIZE_COLS):
+        self.grid = spatial_grid()
+        self.bullets = [bullet(0, 0, fill="red") for _ in range(bullets)]
+        for i in range(rows):
+            for j in range(cols):
                 minx = 4 + (j * 12)
                 maxx = 30 + (j * 12)
                 x = 4 + (j * 12)
                 y = 14 + (i * 12)
                 self.invaders.append(invader(minx, maxx, x, y))
+                self.grid.insert(self.invaders[-1])
+        self._size = len(self.invaders)
+        self._score = 0
 
     def render(self, draw):
         for invader in self.invaders:
             invader.render(draw)
 
+        for bullet in self.bullets:
+            bullet.render(draw)
+
     def update(self, bullets):
         for invader in self.invaders:
             if invader.update():
                 self.invaded = True
+            if invader.alive:
+                self.grid.move(invader)
 
-        for invader in self.invaders:
+        for bullet in self.bullets:
+            bullet.update(1)
+
+        for bullet in bullets:
+            if bullet.alive:
+                for invader in self.grid.near(bullet.x, bullet.y):
+                    t = (invader.x - bullet.x) * (invader.x - bullet.x) + (invader.y - bullet.y) * (invader.y - bullet.y)
+                    # if point is in circle
+                    if t < 25:  # 5 * 5 = r * r
+                        self.kill(invader)
+                        bullet.alive = False
+                        break
+
+    def kill(self, invader):
+        invader.alive = False
+        self.grid.remove(invader)
+        self._size -= 1
+        self._score += invader.score
+
+    def shoot(self):
+        """
+        Occasionally has a random invader fire, if there is a bullet free.
+        """
+        if random.random() < ENEMY_FIRE_CHANCE:
+            invader = random.choice(self.invaders)
             if invader.alive:
-                for bullet in bullets:
-                    if bullet.alive:
-                        t = (invader.x - bullet.x) * (invader.x - bullet.x) + (invader.y - bullet.y) * (invader.y - bullet.y)
-                        # if point is in circle
-                        if t < 25:  # 5 * 5 = r * r
-                            invader.alive = False
-                            bullet.alive = False
+                for bullet in self.bullets:
+                    if not bullet.alive:
+                        bullet.reset(invader.x, invader.y + 4)
+                        break
 
     def size(self):
-        size = 0
-        for invader in self.invaders:
-            if invader.alive:
-                size += 1
-        return size
+        return self._size
 
     def score(self):
-        score = 0
-        for invader in self.invaders:
-            if not invader.alive:
-                score += invader.score
-        return score
+        return self._score
+
+
+player_sprite = sprite([arrow], 3, "white", origin=(2, 0))
+invader_sprite = sprite([alien1, alien2, alien3, alien2], 8, "green", origin=(4, 4))
 
 
 def ai_logic_shoot(army, plyr):
@@ -184,55 +320,62 @@ def ai_logic_move(army, plyr, rows):
         i += 1
 
 
-if __name__ == '__main__':
-
-    device = get_device()
-
+def main():
     if device.width < 96 or device.height < 64:
         raise ValueError(f"Unsupported mode: {device.width}x{device.height}")
 
     regulator = framerate_regulator()
     plyr = player()
-    army = army()
-    rows = random.sample(range(12), 12)
+    aliens = army()
+    rows = random.sample(range(len(aliens.invaders)), len(aliens.invaders))
 
     img_path = str(Path(__file__).resolve().parent.joinpath('images', 'splash.bmp'))
     splash = Image.open(img_path) \
         .transform((device.width, device.height), Image.AFFINE, (1, 0, 0, 0, 1, 0), Image.BILINEAR) \
         .convert(device.mode)
 
-    try:
-        # Double buffering in pygame?
-        device.display(splash)
-        device.display(splash)
+    # Double buffering in pygame?
+    device.display(splash)
+    device.display(splash)
+
+    time.sleep(3)
+    device.clear()
 
-        time.sleep(3)
-        device.clear()
+    while not aliens.invaded and aliens.size() > 0 and plyr.lives > 0:
+        with regulator:
+            with canvas(device) as draw:
+                draw.line((0, 61, 95, 61), fill="white")
+                draw.line((0, 63, 95, 63), fill="white")
 
-        while not army.invaded and army.size() > 0:
-            with regulator:
-                with canvas(device) as draw:
-                    draw.line((0, 61, 95, 61), fill="white")
-                    draw.line((0, 63, 95, 63), fill="white")
+                ai_logic_shoot(aliens, plyr)
+                ai_logic_move(aliens, plyr, rows)
 
-                    ai_logic_shoot(army, plyr)
-                    ai_logic_move(army, plyr, rows)
+                aliens.shoot()
+                aliens.update(plyr.bullets)
+                for bullet in aliens.bullets:
+                    if bullet.alive:
+                        plyr.hit(bullet)
 
-                    army.update(plyr.bullets)
+                aliens.render(draw)
+                plyr.render(draw)
 
-                    army.render(draw)
-                    plyr.render(draw)
+                draw.text((8, 0), text=f"Score: {aliens.score()}", fill="blue")
+                draw.text((72, 0), text=f"x{plyr.lives}", fill="white")
 
-                    draw.text((8, 0), text=f"Score: {army.score()}", fill="blue")
+    # Double buffering in pygame?
+    for i in range(2):
+        with canvas(device) as draw:
+            if aliens.size() == 0:
+                draw.text((27, 28), text="Victory", fill="blue")
+            else:
+                draw.text((30, 28), text="Defeat", fill="red")
 
-        # Double buffering in pygame?
-        for i in range(2):
-            with canvas(device) as draw:
-                if army.size() == 0:
-                    draw.text((27, 28), text="Victory", fill="blue")
-                else:
-                    draw.text((30, 28), text="Defeat", fill="red")
+    time.sleep(5)
 
-        time.sleep(5)
+
+if __name__ == '__main__':
+    try:
+        device = get_device()
+        main()
     except KeyboardInterrupt:
         pass
@@ -12,10 +12,92 @@ https://github.com/pimoroni/unicorn-hat-hd/blob/master/examples/matrix-hd.py
 """
 
 from random import randint, gauss
+from PIL import Image
 from demo_opts import get_device
 from luma.core.render import canvas
 from luma.core.sprite_system import framerate_regulator
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+# Use the array-backed rain engine when numpy is available; set to False to
+# use the original per-drop, per-pixel Python loop.
+USE_NUMPY = True
+
+
+class digital_rain(object):
+    """
+    Array-backed digital rain: the drops' positions and speeds are held in
+    NumPy arrays, used as a ring buffer of ``max_population`` drops (so once
+    full, each new drop replaces the oldest), and each frame every drop's
+    trail is stamped into the frame buffer in one fancy-indexed assignment.
+
+    Drops are drawn oldest first, so where trails overlap the newer drop
+    wins, as in the original.
+
+    :param size: The (width, height) of the frame.
+    :param max_population: The maximum number of drops.
+    :param trail: The colours of the trail, from the head of the drop upwards.
+    """
+    def __init__(self, size, max_population, trail):
+        self.width, self.height = size
+        self.capacity = max_population
+        self.x = np.zeros(max_population, dtype=np.int32)
+        self.y = np.zeros(max_population, dtype=np.float64)
+        self.speed = np.zeros(max_population, dtype=np.float64)
+        self.start = 0
+        self.count = 0
+        self.trail = np.array(trail, dtype=np.uint8)
+        self.offsets = np.arange(len(trail))
+        self.frame = np.zeros((self.height, self.width, 3), dtype=np.uint8)
+
+    def __len__(self):
+        return self.count
+
+    def add(self, x, speed):
+        if self.count < self.capacity:
+            index = (self.start + self.count) % self.capacity
+            self.count += 1
+        else:
+            index = self.start
+            self.start = (self.start + 1) % self.capacity
+
+        self.x[index] = x
+        self.y[index] = 0
+        self.speed[index] = speed
+
+    def render(self, speed_jitter=0, brightness_jitter=None):
+        """
+        Draws the drops and moves them on, returning the frame as an image.
+
+        :param speed_jitter: If non-zero, each drop's speed is nudged by up to
+            this much (either way) every frame.
+        :param brightness_jitter: If given, a ``(low, high)`` range that the
+            green of every pixel is randomly scaled by.
+        """
+        live = (self.start + np.arange(self.count)) % self.capacity
+        if speed_jitter:
+            self.speed[live] += np.random.uniform(-speed_jitter, speed_jitter, self.count)
+
+        # One row per drop, one column per trail pixel
+        x = np.broadcast_to(self.x[live, np.newaxis], (self.count, len(self.offsets)))
+        y = self.y[live, np.newaxis] - self.offsets
+        colors = np.broadcast_to(self.trail, (self.count,) + self.trail.shape)
+        if brightness_jitter is not None:
+            colors = colors.copy()
+            green = colors[..., 1] * np.random.uniform(*brightness_jitter, colors.shape[:2])
+            colors[..., 1] = np.clip(green, 0, 255).astype(np.uint8)
+
+        visible = (x >= 0) & (x < self.width) & (y >= 0) & (y < self.height)
+        self.frame.fill(0)
+        self.frame[y[visible].astype(np.int32), x[visible]] = colors[visible]
+
+        self.y[live] += self.speed[live]
+        return Image.fromarray(self.frame)
+
 
 def matrix(device):
     wrd_rgb = [
@@ -45,6 +127,16 @@ def matrix(device):
     def increase_population():
         blue_pilled_population.append([randint(0, device.width), 0, gauss(1.2, 0.6)])
 
+    if USE_NUMPY and np is not None:
+        rain = digital_rain(device.size, max_population, wrd_rgb)
+        while True:
+            clock += 1
+            with regulator:
+                device.display(rain.render().convert(device.mode))
+
+            if clock % 5 == 0 or clock % 3 == 0:
+                rain.add(randint(0, device.width), gauss(1.2, 0.6))
+
     while True:
         clock += 1
         with regulator:
@@ -15,6 +15,7 @@ from random import randint, gauss, uniform
 from demo_opts import get_device
 from luma.core.render import canvas
 from luma.core.sprite_system import framerate_regulator
+from matrix import digital_rain, np
 
 
 # Digital rain intensity setting
@@ -22,6 +23,10 @@ from luma.core.sprite_system import framerate_regulator
 
 DIGITALRAIN_INTENSITY = 5
 
+# Use the array-backed rain engine from matrix.py when numpy is available;
+# set to False to use the original per-drop, per-pixel Python loop.
+USE_NUMPY = True
+
 
 def matrix(device):
     wrd_rgb = [
@@ -59,6 +64,19 @@ def matrix(device):
         interval = max(1, 10 - DIGITALRAIN_INTENSITY)
         return clock % interval == 0
 
+    if USE_NUMPY and np is not None:
+        rain = digital_rain(device.size, max_population, wrd_rgb)
+        drops_per_tick = max(1, int(DIGITALRAIN_INTENSITY * 0.5))
+        while True:
+            clock += 1
+            with regulator:
+                image = rain.render(speed_jitter=0.05, brightness_jitter=(0.6, 1.2))
+                device.display(image.convert(device.mode))
+
+            if should_spawn(clock):
+                for _ in range(drops_per_tick):
+                    rain.add(randint(0, device.width - 1), gauss(1.2, 0.6))
+
     while True:
         clock += 1
         with regulator:
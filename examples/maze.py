@@ -1,6 +1,6 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
-# Copyright (c) 2014-18 Richard Hull and contributors
+# Copyright (c) 2014-2026 Richard Hull and contributors
 # See LICENSE.rst for details.
 # PYTHON_ARGCOMPLETE_OK
 
@@ -9,24 +9,129 @@ Maze generator example.
 
 Adapted from:
 https://github.com/rm-hull/maze/blob/master/src/maze/generator.clj
+
+Mazes can be generated with the recursive backtracker (the default), or
+Wilson's or Eller's algorithms: set ``GENERATOR`` to choose. With ``SCROLL``
+set, an endless maze is generated row by row with Eller's algorithm and
+scrolled up the screen, only ever holding the rows which are visible.
+
+With ``SOLVE`` set, each maze is solved with a breadth-first or A* search
+(``SOLVER``), animated as it goes: only the cells which changed are redrawn
+each frame, and the solver's throughput is logged once it is done.
 """
 
 import time
+import heapq
+import logging
+from array import array
+from collections import deque
+from itertools import islice
 from demo_opts import get_device
 from luma.core.render import canvas
-from random import randrange
+from luma.core.sprite_system import framerate_regulator
+from PIL import Image, ImageDraw
+from random import randrange, random
 
 NORTH = 1
 WEST = 2
 
+# "backtracker", "wilson" or "eller"
+GENERATOR = "backtracker"
+
+# Scroll through an endless maze instead
+SCROLL = False
+
+# Animate solving each maze instead, with "bfs" or "astar", expanding at
+# most STEPS_PER_FRAME cells each frame
+SOLVE = False
+SOLVER = "astar"
+STEPS_PER_FRAME = 8
+SOLVER_FPS = 30
+
+# Colours of the cells on the frontier, explored and on the path found
+COLORS = {"frontier": "yellow", "explored": "navy", "path": "lime"}
+
+# On 1-bit devices all of the above would show as white, so there explored
+# cells are left black, and the frontier is cleared once the path is found
+MONO_COLORS = {"frontier": "white", "explored": "black", "path": "white"}
+
+
+def wall_bitmap(data, width, height, scale):
+    """
+    Renders the walls of (part of) a maze into a mask of size
+    ``(width * scale + 1, height * scale + 1)``, with a wall from each cell's
+    top-left corner along the top (``NORTH``) and the left (``WEST``) sides.
+    """
+    stride = width * scale + 1
+    mask = bytearray(stride * (height * scale + 1))
+    wall = b"\xff" * (scale + 1)
+
+    for i, walls in enumerate(data):
+        if walls:
+            x, y = i % width, i // width
+            start = y * scale * stride + x * scale
+            if walls & NORTH:
+                mask[start:start + scale + 1] = wall
+            if walls & WEST:
+                mask[start:start + scale * stride + 1:stride] = wall
+
+    return Image.frombytes("L", (stride, height * scale + 1), bytes(mask))
+
+
+def eller(width, height=None):
+    """
+    Generates a maze row by row with Eller's algorithm, yielding the walls of
+    each row (as an array of ``NORTH``/``WEST`` bits) as soon as it is done.
+    Only the current row is held, so if ``height`` is ``None`` the maze goes
+    on for ever.
+    """
+    sets = list(range(width))
+    next_set = width
+    north = array("B", [NORTH]) * width
+    y = 0
+
+    while height is None or y < height:
+        last = height is not None and y == height - 1
+        row = array("B", north)
+        row[0] |= WEST
+
+        # Randomly join adjacent cells which are not already connected (all
+        # of them on the last row, so that the maze is connected)
+        for x in range(1, width):
+            if sets[x] != sets[x - 1] and (last or random() < 0.5):
+                old = sets[x]
+                sets = [sets[x - 1] if s == old else s for s in sets]
+            else:
+                row[x] |= WEST
+
+        yield row
+        if last:
+            return
+
+        # Each set must extend down into the next row at least once
+        north = array("B", [NORTH]) * width
+        members = {}
+        for x, s in enumerate(sets):
+            members.setdefault(s, []).append(x)
+        for cells in members.values():
+            down = [x for x in cells if random() < 0.5] or [cells[randrange(len(cells))]]
+            for x in down:
+                north[x] = 0
+
+        for x in range(width):
+            if north[x]:
+                sets[x] = next_set
+                next_set += 1
+        y += 1
+
 
 class Maze(object):
 
-    def __init__(self, size):
+    def __init__(self, size, generator=None):
         self.width = int(size[0])
         self.height = int(size[1])
         self.size = self.width * self.height
-        self.generate()
+        self.generate(generator or GENERATOR)
 
     def offset(self, coords):
         """ Converts [x,y] co-ords into an offset in the maze data """
@@ -81,56 +186,82 @@ class Maze(object):
         if p2 - p1 == 1:
             self.data[p2] &= NORTH
 
-    def generate(self):
-        self.data = [NORTH | WEST] * self.size
-        visited = {0: True}
+    def visit(self, pos):
+        self.visited[pos >> 3] |= 1 << (pos & 7)
+
+    def is_visited(self, pos):
+        return self.visited[pos >> 3] & (1 << (pos & 7)) != 0
+
+    def generate(self, generator="backtracker"):
+        self.data = array("B", [NORTH | WEST]) * self.size
+        self.visited = bytearray((self.size + 7) // 8)
+        generators = {
+            "backtracker": self.generate_backtracker,
+            "wilson": self.generate_wilson,
+            "eller": self.generate_eller,
+        }
+        generators[generator]()
+
+    def generate_backtracker(self):
+        self.visit(0)
         stack = [0]
-        not_visited = lambda x: not visited.get(x, False)
 
         while len(stack) > 0:
             curr = stack[-1]
-            n = list(filter(not_visited, self.neighbours(curr)))
+            n = [p for p in self.neighbours(curr) if not self.is_visited(p)]
             sz = len(n)
             if sz == 0:
                 stack.pop()
             else:
                 np = n[randrange(sz)]
                 self.knockdown_wall(curr, np)
-                visited[np] = True
+                self.visit(np)
                 if sz == 1:
                     stack.pop()
                 stack.append(np)
 
-    def render(self, draw, scale=lambda a: a):
-
-        for i in range(self.size):
-            line = []
-            p1 = self.coords(i)
-
-            if self.data[i] & NORTH > 0:
-                p2 = (p1[0] + 1, p1[1])
-                line += p2 + p1
-
-            if self.data[i] & WEST > 0:
-                p3 = (p1[0], p1[1] + 1)
-                line += p1 + p3
-
-            draw.line(list(map(scale, line)), fill="white")
-
-        draw.rectangle(list(map(scale, [0, 0, self.width, self.height])), outline="white")
+    def generate_wilson(self):
+        """ Wilson's algorithm: random walks from each cell not yet in the
+            maze until they hit it, with any loops erased, are added to the
+            maze. Unlike the backtracker, this is not biased towards long
+            winding corridors. """
+        exits = array("l", [0]) * self.size
+        self.visit(randrange(self.size))
+
+        for start in range(self.size):
+            pos = start
+            while not self.is_visited(pos):
+                n = self.neighbours(pos)
+                # Only the last exit from each cell is kept, which erases loops
+                exits[pos] = n[randrange(len(n))]
+                pos = exits[pos]
+
+            pos = start
+            while not self.is_visited(pos):
+                self.knockdown_wall(pos, exits[pos])
+                self.visit(pos)
+                pos = exits[pos]
+
+    def generate_eller(self):
+        for y, row in enumerate(eller(self.width, self.height)):
+            self.data[y * self.width:(y + 1) * self.width] = row
+
+    def render(self, draw, scale=1):
+        draw.bitmap((0, 0), wall_bitmap(self.data, self.width, self.height, scale), fill="white")
+        draw.rectangle([0, 0, self.width * scale, self.height * scale], outline="white")
 
     def to_string(self):
         s = ""
         for y in range(self.height):
             for x in range(self.width):
                 s += "+"
-                if self.data[self.offset(x, y)] & NORTH != 0:
+                if self.data[self.offset((x, y))] & NORTH != 0:
                     s += "---"
                 else:
                     s += "   "
             s += "+\n"
             for x in range(self.width):
-                if self.data[self.offset(x, y)] & WEST != 0:
+                if self.data[self.offset((x, y))] & WEST != 0:
                     s += "|"
                 else:
                     s += " "
@@ -142,18 +273,187 @@ class Maze(object):
         return s
 
 
+class solver(object):
+    """
+    Searches for a path between two cells of a maze, a few cells at a time,
+    keeping track of which cells changed state (joined the frontier, were
+    explored or are on the path) since they were last collected, so that
+    only those need to be redrawn.
+
+    :param maze: The maze to solve.
+    :param start: The offset of the cell to start from.
+    :param goal: The offset of the cell to find.
+    :param algorithm: "bfs" (breadth-first search) or "astar" (A* search,
+        using the Manhattan distance to the goal).
+    """
+    def __init__(self, maze, start, goal, algorithm="astar"):
+        self.maze = maze
+        self.goal = goal
+        self.astar = algorithm == "astar"
+        self.came_from = array("l", [-1]) * maze.size
+        self.came_from[start] = start
+        self.frontier = [] if self.astar else deque()
+        self.changes = []
+        self.explored = 0
+        self.path = None
+        self.elapsed = 0
+        self.add(start, 0)
+
+    def heuristic(self, pos):
+        (x1, y1), (x2, y2) = self.maze.coords(pos), self.maze.coords(self.goal)
+        return abs(x1 - x2) + abs(y1 - y2)
+
+    def add(self, pos, distance):
+        if self.astar:
+            heapq.heappush(self.frontier, (distance + self.heuristic(pos), distance, pos))
+        else:
+            self.frontier.append((distance, pos))
+        self.changes.append((pos, "frontier"))
+
+    def passages(self, pos):
+        """ The cells which can be reached from the given cell """
+        maze, data, width = self.maze, self.maze.data, self.maze.width
+        if pos >= width and not data[pos] & NORTH:
+            yield pos - width
+        if pos % width > 0 and not data[pos] & WEST:
+            yield pos - 1
+        if pos % width < width - 1 and not data[pos + 1] & WEST:
+            yield pos + 1
+        if pos + width < maze.size and not data[pos + width] & NORTH:
+            yield pos + width
+
+    def step(self, budget):
+        """
+        Explores up to ``budget`` cells, returning ``True`` once the search
+        is over (whether or not a path was found).
+        """
+        start = time.perf_counter()
+        while budget > 0 and self.frontier and self.path is None:
+            if self.astar:
+                _, distance, pos = heapq.heappop(self.frontier)
+            else:
+                distance, pos = self.frontier.popleft()
+            self.changes.append((pos, "explored"))
+            self.explored += 1
+            budget -= 1
+
+            if pos == self.goal:
+                self.path = self.trace(pos)
+                self.changes.extend((p, "path") for p in self.path)
+                break
+
+            for n in self.passages(pos):
+                if self.came_from[n] < 0:
+                    self.came_from[n] = pos
+                    self.add(n, distance + 1)
+
+        self.elapsed += time.perf_counter() - start
+        return self.path is not None or not self.frontier
+
+    def trace(self, pos):
+        path = [pos]
+        while self.came_from[pos] != pos:
+            pos = self.came_from[pos]
+            path.append(pos)
+        return path[::-1]
+
+    def collect_changes(self):
+        """ Returns the cells which changed state since the last call, with
+            their new state. """
+        changes, self.changes = self.changes, []
+        return changes
+
+    def stats(self):
+        rate = self.explored / self.elapsed if self.elapsed else 0
+        length = len(self.path) if self.path else 0
+        return f"Explored {self.explored} cells at {rate:.0f} cells/sec, path length: {length}"
+
+
+def paint(draw, maze, changes, scale, colors):
+    """ Fills in the insides of the given cells (leaving the walls alone),
+        in the colour of their state """
+    for pos, state in changes:
+        x, y = maze.coords(pos)
+        draw.rectangle([x * scale + 1, y * scale + 1, (x + 1) * scale - 1, (y + 1) * scale - 1], fill=colors[state])
+
+
+def solve(scale=2):
+    regulator = framerate_regulator(fps=SOLVER_FPS)
+    colors = MONO_COLORS if device.mode == "1" else COLORS
+    while True:
+        maze = Maze([z // scale - 1 for z in device.size])
+        image = Image.new(device.mode, device.size)
+        draw = ImageDraw.Draw(image)
+        maze.render(draw, scale)
+        device.display(image)
+
+        search = solver(maze, 0, maze.size - 1, SOLVER)
+        frames = 0
+        draw_time = 0
+        done = False
+        while not done:
+            with regulator:
+                done = search.step(STEPS_PER_FRAME)
+                start = time.perf_counter()
+                paint(draw, maze, search.collect_changes(), scale, colors)
+                device.display(image)
+                draw_time += time.perf_counter() - start
+                frames += 1
+
+        if device.mode == "1" and search.path:
+            # The cells still on the frontier look just like the path
+            paint(draw, maze, [(entry[-1], "explored") for entry in search.frontier], scale, colors)
+            device.display(image)
+
+        logging.info(f"Solved {maze.width}x{maze.height} maze with {SOLVER}: {search.stats()}, "
+                     f"drawing took {draw_time * 1000 / frames:.2f} ms/frame")
+        time.sleep(2)
+
+
 def demo(iterations):
     for loop in range(iterations):
         for scale in [2, 3, 4, 3]:
             sz = list(map(lambda z: z // scale - 1, device.size))
             with canvas(device) as draw:
-                Maze(sz).render(draw, lambda z: int(z * scale))
+                Maze(sz).render(draw, scale)
                 time.sleep(1)
 
 
+def scroll(scale=3, delay=0.05):
+    width = device.width // scale - 1
+    # One row more than fits on the screen is held above the top, as its
+    # west walls reach down onto the top line of the first visible row
+    num_rows = device.height // scale + 3
+    rows = eller(width)
+    visible = deque(islice(rows, num_rows), maxlen=num_rows)
+
+    while True:
+        walls = wall_bitmap([walls for row in visible for walls in row], width, num_rows, scale)
+
+        # Each frame shows the rows one pixel further up, so the maze moves
+        # by exactly one pixel a frame, including when a new row is added
+        for y in range(scale):
+            with canvas(device) as draw:
+                draw.bitmap((0, -scale - y), walls, fill="white")
+                draw.line([0, 0, 0, device.height], fill="white")
+                draw.line([width * scale, 0, width * scale, device.height], fill="white")
+            time.sleep(delay)
+
+        visible.append(next(rows))
+
+
+def main():
+    if SCROLL:
+        scroll()
+    elif SOLVE:
+        solve()
+    else:
+        demo(20)
+
+
 if __name__ == "__main__":
     try:
         device = get_device()
-        demo(20)
+        main()
     except KeyboardInterrupt:
         pass
@@ -7,16 +7,24 @@
 """
 Another vertical scrolling demo, images (used without permission)
 from @pixel_dailies twitter feed.
+
+On SSD1306-family displays, vertical scrolling is done by moving the
+display's start line, so that only the newly exposed rows are sent each step.
 """
 
 import time
+import logging
 import random
 from pathlib import Path
 from demo_opts import get_device
-from luma.core.virtual import viewport
+from tiled_viewport import tiled_viewport, scroller
 from PIL import Image
 
 
+# Scroll using the display's start line, on devices which have one
+HARDWARE_SCROLL = True
+
+
 def scroll_down(virtual, pos):
     x, y = pos
     if virtual.height > device.height:
@@ -64,6 +72,8 @@ def main():
         "pixelart5.jpg"
     ]
 
+    scroll = scroller(device, hardware=HARDWARE_SCROLL)
+
     while True:
         img_path = str(Path(__file__).resolve().parent.joinpath('images', random.choice(images)))
         pixel_art = Image.open(img_path).convert(device.mode)
@@ -74,7 +84,7 @@ def main():
             pixel_art = pixel_art.resize((int(w * ratio), int(h * ratio)), Image.LANCZOS)
             w, h = pixel_art.size
 
-        virtual = viewport(device, width=w, height=h)
+        virtual = tiled_viewport(device, width=w, height=h, scroller=scroll)
 
         virtual.display(pixel_art)
 
@@ -90,6 +100,8 @@ def main():
         pos = scroll_left(virtual, pos)
         time.sleep(2)
 
+        logging.info(f"Scrolling: {scroll.stats()}")
+
 
 if __name__ == "__main__":
     try:
@@ -12,9 +12,22 @@ http://codentronix.com/2011/05/28/3d-starfield-made-using-python-and-pygame/
 """
 
 from random import randrange
+from PIL import Image
 from demo_opts import get_device
 from luma.core.render import canvas
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+NUM_STARS = 512
+
+# Use the NumPy particle engine when available; set to False to use the
+# original per-star Python loop.
+USE_NUMPY = True
+
 
 def init_stars(num_stars, max_depth):
     stars = []
@@ -60,11 +73,79 @@ def move_and_draw_stars(stars, max_depth):
                 draw.rectangle((x, y, x + size, y + size), fill=shade)
 
 
+class star_field(object):
+    """
+    NumPy version of the above: the stars are held as separate X, Y & Z
+    arrays, so that moving, projecting, culling and respawning them are
+    whole-array operations. Visible stars are stamped into a greyscale frame
+    buffer, nearer (brighter) stars taking precedence where they overlap.
+    """
+    def __init__(self, num_stars, max_depth):
+        self.max_depth = max_depth
+        self.x = np.random.randint(-25, 25, num_stars).astype(np.float32)
+        self.y = np.random.randint(-25, 25, num_stars).astype(np.float32)
+        self.z = np.random.randint(1, max_depth, num_stars).astype(np.float32)
+        self.frame = np.zeros((device.height, device.width), dtype=np.uint8)
+
+    def move(self):
+        self.z -= 0.19
+
+        respawn = self.z <= 0
+        count = np.count_nonzero(respawn)
+        if count:
+            self.x[respawn] = np.random.randint(-25, 25, count)
+            self.y[respawn] = np.random.randint(-25, 25, count)
+            self.z[respawn] = self.max_depth
+
+    def render(self):
+        width, height = device.size
+
+        k = 128.0 / self.z
+        x = (self.x * k + width // 2).astype(np.int32)
+        y = (self.y * k + height // 2).astype(np.int32)
+
+        visible = (x >= 0) & (x < width) & (y >= 0) & (y < height)
+        x, y = x[visible], y[visible]
+        nearness = 1 - self.z[visible] / self.max_depth
+
+        # Equivalent to the draw.rectangle of the original, which covers
+        # int(size) + 1 pixels in each direction
+        side = (nearness * 4).astype(np.int32) + 1
+        if device.mode == "RGB":
+            shade = (100 + nearness * 155).astype(np.uint8)
+        else:
+            shade = np.full(len(x), 255, dtype=np.uint8)
+
+        self.frame.fill(0)
+        pixels = self.frame.ravel()
+        for dy in range(4):
+            for dx in range(4):
+                stamp = side > max(dx, dy)
+                px = x[stamp] + dx
+                py = y[stamp] + dy
+                inside = (px < width) & (py < height)
+                np.maximum.at(pixels, py[inside] * width + px[inside], shade[stamp][inside])
+
+        return Image.fromarray(self.frame).convert(device.mode)
+
+
 def main():
     max_depth = 32
-    stars = init_stars(512, max_depth)
-    while True:
-        move_and_draw_stars(stars, max_depth)
+
+    use_numpy = USE_NUMPY
+    if use_numpy and np is None:
+        print("The numpy library could not be found, falling back to the pure-Python renderer. Install it using 'sudo -H pip install numpy'.")
+        use_numpy = False
+
+    if use_numpy:
+        stars = star_field(NUM_STARS, max_depth)
+        while True:
+            stars.move()
+            device.display(stars.render())
+    else:
+        stars = init_stars(NUM_STARS, max_depth)
+        while True:
+            move_and_draw_stars(stars, max_depth)
 
 
 if __name__ == "__main__":
@@ -18,15 +18,14 @@ import signal
 import sys
 import time
 import socket
-from pathlib import Path
 from datetime import datetime
 
 if os.name != 'posix':
     sys.exit(f'{os.name} platform is not supported')
 
 from demo_opts import get_device
+from font_registry import make_font
 from luma.core.render import canvas
-from PIL import ImageFont
 
 try:
     import psutil
@@ -129,8 +128,7 @@ def network(iface):
 
 def stats(device):
     # use custom font
-    font_path = str(Path(__file__).resolve().parent.joinpath('fonts', 'DejaVuSansMono.ttf'))
-    font2 = ImageFont.truetype(font_path, 10)
+    font2 = make_font('DejaVuSansMono.ttf', 10)
     ascent, descent = font2.getmetrics()
     line_height = ascent + descent
 
@@ -14,11 +14,10 @@ Needs psutil (+ dependencies) installed::
 """
 
 import time
-from pathlib import Path
 from datetime import datetime
 from demo_opts import get_device
+from font_registry import make_font
 from luma.core.render import canvas
-from PIL import ImageFont
 import psutil
 import subprocess as sp
 import socket
@@ -163,8 +162,8 @@ network_interface_name = None
 
 
 device = get_device()
-font_default = ImageFont.truetype(str(Path(__file__).resolve().parent.joinpath("fonts", "DejaVuSansMono.ttf")), font_size)
-font_full = ImageFont.truetype(str(Path(__file__).resolve().parent.joinpath("fonts", "DejaVuSansMono.ttf")), font_size_full)
+font_default = make_font("DejaVuSansMono.ttf", font_size)
+font_full = make_font("DejaVuSansMono.ttf", font_size_full)
 
 
 while True:
@@ -9,15 +9,9 @@ Simple println capabilities.
 """
 
 import time
-from pathlib import Path
 from demo_opts import get_device
+from font_registry import make_font
 from luma.core.virtual import terminal
-from PIL import ImageFont
-
-
-def make_font(name, size):
-    font_path = str(Path(__file__).resolve().parent.joinpath('fonts', name))
-    return ImageFont.truetype(font_path, size)
 
 
 def main():
@@ -0,0 +1,320 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2026 Richard Hull and contributors
+# See LICENSE.rst for details.
+
+"""
+A viewport whose virtual surface is kept as a grid of device-sized tiles.
+"""
+
+import zlib
+from PIL import Image
+from luma.core.virtual import viewport, pool
+from demo_opts import RAM_ROWS, supports_hardware_scroll, set_start_line, partial_update, wire_bytes
+
+
+# Tiles further than this many tiles away from the ones under the viewport
+# are compressed until they are next needed
+TILE_WINDOW = 1
+
+
+class tiled_viewport(viewport):
+    """
+    A drop-in replacement for :py:class:`luma.core.virtual.viewport`, which
+    keeps the virtual surface as tiles the size of the device rather than as
+    one large image.
+
+    Hotspots are only pasted (into the tiles they cover) when their
+    ``should_redraw`` says so, and each frame is made up from the (at most
+    four) tiles under the viewport. Moving to the position the viewport is
+    already at sends nothing to the device unless a hotspot was redrawn, and
+    tiles outside a window around the viewport are compressed, so that tall
+    surfaces don't all have to be kept uncompressed in memory.
+
+    :param window: How many tiles either side of those under the viewport are
+        kept uncompressed.
+    :type window: int
+    :param scroller: Sends the frames to the device, if given, instead of
+        ``device.display``.
+    :type scroller: scroller
+    """
+    def __init__(self, device, width, height, mode=None, dither=False, window=TILE_WINDOW, scroller=None):
+        super(tiled_viewport, self).__init__(device, width, height, mode=mode, dither=dither)
+        # The tiles take the place of the single backing image
+        self._backing_image = None
+        self._tile_size = device.size
+        self._tiles = {}
+        self._packed = {}
+        self._shown = None
+        self._box = None
+        self._scroller = scroller
+        self.window = window
+        self.frames = 0
+        self.skipped = 0
+        self.unpacked = 0
+
+    def _tile_box(self, key):
+        col, row = key
+        tw, th = self._tile_size
+        left, top = col * tw, row * th
+        return (left, top, min(left + tw, self.width), min(top + th, self.height))
+
+    def _keys(self, box):
+        left, top, right, bottom = box
+        tw, th = self._tile_size
+        return [(col, row)
+                for row in range(top // th, (bottom - 1) // th + 1)
+                for col in range(left // tw, (right - 1) // tw + 1)]
+
+    def _tile(self, key):
+        """
+        Returns the tile, uncompressing it (or creating a blank one) if need
+        be.
+        """
+        tile = self._tiles.get(key)
+        if tile is None:
+            left, top, right, bottom = self._tile_box(key)
+            size = (right - left, bottom - top)
+            data = self._packed.pop(key, None)
+            if data is None:
+                tile = Image.new(self.mode, size)
+            else:
+                tile = Image.frombytes(self.mode, size, zlib.decompress(data))
+                self.unpacked += 1
+            self._tiles[key] = tile
+        return tile
+
+    def _paste(self, image, xy):
+        x, y = xy
+        for key in self._keys((x, y, x + image.width, y + image.height)):
+            left, top, _, _ = self._tile_box(key)
+            self._tile(key).paste(image, (x - left, y - top))
+        self._dirty = True
+
+    def _evict(self):
+        """
+        Compresses the tiles outside the window around the viewport; blank
+        tiles are dropped altogether.
+        """
+        (left, top, right, bottom) = self._crop_box()
+        tw, th = self._tile_size
+        cols = (left // tw - self.window, (right - 1) // tw + self.window)
+        rows = (top // th - self.window, (bottom - 1) // th + self.window)
+        for key in list(self._tiles):
+            col, row = key
+            if not (cols[0] <= col <= cols[1] and rows[0] <= row <= rows[1]):
+                tile = self._tiles.pop(key)
+                if tile.getbbox() is not None:
+                    self._packed[key] = zlib.compress(tile.tobytes(), 1)
+
+    def display(self, image):
+        assert image.mode == self.mode
+        assert image.size == self.size
+
+        self._tiles.clear()
+        self._packed.clear()
+        for key in self._keys((0, 0) + self.size):
+            self._tiles[key] = image.crop(self._tile_box(key))
+        self._evict()
+        self._dirty = True
+        self.refresh(force=True)
+
+    def set_position(self, xy):
+        moved = xy != self._position
+        self._position = xy
+        self.refresh(force=moved)
+
+    def remove_hotspot(self, hotspot, xy):
+        self._hotspots.remove((hotspot, xy))
+        self._paste(Image.new(self.mode, hotspot.size), xy)
+
+    def refresh(self, force=False):
+        redrawn = []
+        for hotspot, xy in self._hotspots:
+            if self.is_overlapping_viewport(hotspot, xy) and hotspot.should_redraw():
+                im = Image.new(self.mode, hotspot.size)
+                pool.add_task(hotspot.paste_into, im, (0, 0))
+                redrawn.append((im, xy))
+
+        if redrawn:
+            pool.wait_completion()
+            for im, xy in redrawn:
+                self._paste(im, xy)
+
+        box = self._crop_box()
+        if not (force or self._dirty):
+            self.skipped += 1
+            return
+
+        if self._scroller is None:
+            self._device.display(self.frame(box))
+        else:
+            # The whole frame has to be sent if anything other than the
+            # position changed
+            self._scroller.show(self, None if self._dirty else self._box, box)
+
+        self._dirty = False
+        self._box = box
+        self.frames += 1
+        keys = self._keys(box)
+        if keys != self._shown:
+            self._shown = keys
+            self._evict()
+
+    def frame(self, box):
+        """
+        Returns the part of the virtual surface inside the box (which must lie
+        within it), in the device's mode.
+        """
+        keys = self._keys(box)
+        left, top, right, bottom = box
+        if len(keys) == 1:
+            tile_left, tile_top, _, _ = self._tile_box(keys[0])
+            im = self._tile(keys[0]).crop((left - tile_left, top - tile_top,
+                                           right - tile_left, bottom - tile_top))
+        else:
+            im = Image.new(self.mode, (right - left, bottom - top))
+            for key in keys:
+                tile_left, tile_top, _, _ = self._tile_box(key)
+                im.paste(self._tile(key), (tile_left - left, tile_top - top))
+
+        if self._dither:
+            im = im.convert(self._device.mode)
+        return im
+
+    def stats(self):
+        """
+        Returns the number of frames sent to the device, the number of
+        refreshes which didn't need to send one, how many tiles are held
+        uncompressed and compressed, and how often a tile was uncompressed.
+        """
+        return {
+            "frames": self.frames,
+            "skipped": self.skipped,
+            "tiles": len(self._tiles),
+            "packed": len(self._packed),
+            "unpacked": self.unpacked,
+        }
+
+
+class scroller(object):
+    """
+    Sends the frames of a :py:class:`tiled_viewport` to the device. When the
+    viewport has only moved vertically, by less than the height of the screen,
+    and the device can scroll in hardware (see
+    :py:func:`demo_opts.supports_hardware_scroll`), only the pages of display
+    RAM which the newly exposed rows fall in are sent, and the display's start
+    line is moved to scroll the rest; otherwise full frames are sent.
+
+    It also counts the bytes of pixel data sent, along with what sending every
+    frame in full would have taken, and what sending only the band of each
+    frame newly exposed by the move would have taken: so the saving can be
+    measured on devices (like the emulators) which only take full frames.
+
+    :param hardware: Scroll in hardware, where the device can.
+    :type hardware: bool
+    """
+    def __init__(self, device, hardware=True):
+        self.device = device
+        self.hardware = hardware and supports_hardware_scroll(device)
+        # The virtual row held in row 0 of the display RAM, and the row of
+        # the display RAM shown at the top of the screen
+        self.origin = 0
+        self.start_line = 0
+        self.frames = 0
+        self.scrolled = 0
+        self.bytes = 0
+        self.full_bytes = 0
+        self.band_bytes = 0
+
+    def exposed(self, previous, box):
+        """
+        Returns the band of the screen (in screen coordinates) which moving the
+        viewport from the previous box to the new one exposes, or ``None`` if
+        the move is not along one axis by less than the size of the screen.
+        """
+        if previous is None:
+            return None
+
+        width, height = self.device.size
+        dx, dy = box[0] - previous[0], box[1] - previous[1]
+        if dx == 0 and 0 < abs(dy) < height:
+            return (0, height - dy, width, height) if dy > 0 else (0, 0, width, -dy)
+        if dy == 0 and 0 < abs(dx) < width:
+            return (width - dx, 0, width, height) if dx > 0 else (0, 0, -dx, height)
+        return None
+
+    def show(self, virtual, previous, box):
+        """
+        Shows the part of the virtual surface inside the box, which was last
+        at the previous box (or ``None`` if the screen has to be redrawn in
+        full).
+        """
+        full = wire_bytes(self.device, (0, 0) + self.device.size)
+        band = self.exposed(previous, box)
+        self.frames += 1
+        self.full_bytes += full
+        self.band_bytes += full if band is None else wire_bytes(self.device, band)
+
+        if self.hardware and band is not None and box[0] == previous[0]:
+            self.bytes += self.scroll(virtual, previous, box)
+            self.scrolled += 1
+        else:
+            if self.hardware:
+                # A full frame fills the display RAM from the top of the
+                # screen down, whatever was scrolled before
+                if self.start_line != 0:
+                    self.start_line = 0
+                    set_start_line(self.device, 0)
+                self.origin = box[1]
+            self.device.display(virtual.frame(box))
+            self.bytes += full
+
+    def scroll(self, virtual, previous, box):
+        """
+        Writes the pages of display RAM holding the newly exposed rows and
+        moves the start line, returning the number of bytes sent. Each row of
+        RAM holds the virtual row which is a multiple of its height away, so
+        the rows still on screen never need to be sent again.
+        """
+        left, top, right, bottom = box
+        width = right - left
+        exposed = [y for y in range(top, bottom) if not previous[1] <= y < previous[3]]
+        pages = sorted({(y - self.origin) % RAM_ROWS // 8 for y in exposed})
+
+        ram = Image.new(self.device.mode, (width, RAM_ROWS))
+        for page in pages:
+            # The virtual rows making up a page are contiguous, unless the
+            # page straddles the top of the screen
+            rows = [top + (row + self.origin - top) % RAM_ROWS for row in range(page * 8, page * 8 + 8)]
+            start = 0
+            for i in range(1, 9):
+                if i == 8 or rows[i] != rows[i - 1] + 1:
+                    ram.paste(virtual.frame((left, rows[start], right, rows[i - 1] + 1)), (0, page * 8 + start))
+                    start = i
+
+        # Consecutive pages are sent together
+        first = pages[0]
+        for i, page in enumerate(pages):
+            if i + 1 == len(pages) or pages[i + 1] != page + 1:
+                partial_update(self.device, ram, (0, first * 8, width, page * 8 + 8))
+                if i + 1 < len(pages):
+                    first = pages[i + 1]
+
+        self.start_line = (top - self.origin) % RAM_ROWS
+        set_start_line(self.device, self.start_line)
+        return width * len(pages)
+
+    def stats(self):
+        """
+        Returns the number of frames shown and how many of those were
+        scrolled in hardware, along with the bytes of pixel data sent, the
+        bytes that sending every frame in full would have taken and the bytes
+        that sending only the newly exposed bands would have taken.
+        """
+        return {
+            "frames": self.frames,
+            "scrolled": self.scrolled,
+            "bytes": self.bytes,
+            "full_bytes": self.full_bytes,
+            "band_bytes": self.band_bytes,
+        }
@@ -1,53 +1,74 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
-# Copyright (c) 2014-18 Richard Hull and contributors
+# Copyright (c) 2014-2026 Richard Hull and contributors
 # See LICENSE.rst for details.
 # PYTHON_ARGCOMPLETE_OK
 
 """
 Example image-blitting.
+
+The snow is generated afresh for every frame, straight from random bytes in
+the device's own colour mode, and the caption is rendered just once and then
+pasted over each frame through a mask.
 """
 
-import struct
-import random
+import os
 from demo_opts import get_device
-from luma.core.render import canvas
 from PIL import Image, ImageDraw
 
 
-device = get_device()
-size = (60, 30)
-# Calc offset to center text vertically and horizontally
-offset = ((device.width - size[0]) // 2, (device.height - size[1]) // 2)
-shadow_offset = (offset[0] + 1, offset[1] + 1)
+TEXT = "Please do\nnot adjust\nyour set"
+TEXT_SIZE = (60, 30)
 
 
-def snow():
-    data = [random.randint(0, 0xFFFFFF)
-            for _ in range(device.width * device.height)]
-    packed = struct.pack('i' * len(data), *data)
-    background = Image.frombytes("RGBA", device.size, packed)
+def noise(mode, size):
+    """
+    Returns an image of random pixels in the given mode ("1", "L", "RGB" or
+    "RGBA", the last being opaque).
+    """
+    if mode == "RGBA":
+        return noise("RGB", size).convert(mode)
 
-    draw = ImageDraw.Draw(background)
-    draw.multiline_text(shadow_offset, "Please do\nnot adjust\nyour set", fill="black", align="center", spacing=-1)
-    draw.multiline_text(offset, "Please do\nnot adjust\nyour set", fill="white", align="center", spacing=-1)
+    width, height = size
+    if mode == "1":
+        # Pixels are packed 8 to a byte, with each row padded to a whole byte
+        num_bytes = (width + 7) // 8 * height
+    else:
+        num_bytes = width * height * Image.getmodebands(mode)
+    return Image.frombytes(mode, size, os.urandom(num_bytes))
 
-    return background.convert(device.mode)
 
+def caption(mode, size):
+    """
+    Renders the text (with a drop shadow) centred on an image of the given
+    mode and size, returning the image along with a mask of the pixels that
+    the text covers.
+    """
+    # Calc offset to center text vertically and horizontally
+    offset = ((size[0] - TEXT_SIZE[0]) // 2, (size[1] - TEXT_SIZE[1]) // 2)
+    shadow_offset = (offset[0] + 1, offset[1] + 1)
 
-def main():
-    with canvas(device) as draw:
-        draw.multiline_text(offset, "Please do\nnot adjust\nyour set", fill="white", align="center", spacing=-1)
+    image = Image.new("RGB", size, "black")
+    mask = Image.new("L", size, 0)
+    for target, shadow_fill, fill in [(image, "black", "white"), (mask, 255, 255)]:
+        draw = ImageDraw.Draw(target)
+        draw.multiline_text(shadow_offset, TEXT, fill=shadow_fill, align="center", spacing=-1)
+        draw.multiline_text(offset, TEXT, fill=fill, align="center", spacing=-1)
+
+    return image.convert(mode), mask
 
-    images = [snow() for _ in range(20)]
+
+def main():
+    text, mask = caption(device.mode, device.size)
     while True:
-        random.shuffle(images)
-        for background in images:
-            device.display(background)
+        background = noise(device.mode, device.size)
+        background.paste(text, (0, 0), mask)
+        device.display(background)
 
 
 if __name__ == "__main__":
     try:
+        device = get_device()
         main()
     except KeyboardInterrupt:
         pass
@@ -35,8 +35,6 @@ search_terms = ['python']
 
 import sys
 import time
-from pathlib import Path
-from PIL import ImageFont
 
 try:
     from Queue import Queue
@@ -44,8 +42,9 @@ except ImportError:
     from queue import Queue
 
 from demo_opts import get_device
+from font_registry import make_font
 from luma.core.render import canvas
-from luma.core.virtual import viewport
+from tiled_viewport import tiled_viewport
 
 
 try:
@@ -55,11 +54,6 @@ except ImportError:
     sys.exit()
 
 
-def make_font(name, size):
-    font_path = str(Path(__file__).resolve().parent.joinpath('fonts', name))
-    return ImageFont.truetype(font_path, size)
-
-
 def scroll_message(status, font=None, speed=1):
     author = f"@{status.author.screen_name}"
     full_text = f"{author}  {status.text}".replace("\n", " ")
@@ -70,7 +64,7 @@ def scroll_message(status, font=None, speed=1):
         left, top, right, bottom = draw.textbbox((0, 0), full_text, font)
         w, h = right - left, bottom - top
 
-    virtual = viewport(device, width=max(device.width, w + x + x), height=max(h, device.height))
+    virtual = tiled_viewport(device, width=max(device.width, w + x + x), height=max(h, device.height))
     with canvas(virtual) as draw:
         draw.text((x, 0), full_text, font=font, fill="white")
         draw.text((x, 0), author, font=font, fill="yellow")
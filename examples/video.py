@@ -1,12 +1,17 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
-# Copyright (c) 2017-2023 Richard Hull and contributors
+# Copyright (c) 2017-2026 Richard Hull and contributors
 # See LICENSE.rst for details.
 # PYTHON_ARGCOMPLETE_OK
 
 """
 Display a video clip.
 
+Decoding, scaling and conversion to the device's colour mode each run on
+their own thread, connected by bounded queues, and frames are displayed in
+time with the clip's presentation timestamps: if playback falls behind,
+late frames are dropped rather than letting the video drift.
+
 Make sure to install the av system packages:
 
   $ sudo apt-get install -y libavformat-dev libavcodec-dev libavdevice-dev libavutil-dev libswscale-dev libavresample-dev libavfilter-dev
@@ -17,11 +22,12 @@ And the pyav package (might take a while):
 """
 
 import sys
+import time
+import queue
+import threading
 from pathlib import Path
 from demo_opts import get_device
 
-import PIL
-
 try:
     import av
 except ImportError:
@@ -29,22 +35,149 @@ except ImportError:
     sys.exit()
 
 
+# Pixel format to have libswscale produce for each device mode; 1-bit
+# devices get greyscale, which is then dithered.
+pixel_formats = {
+    "1": "gray",
+    "L": "gray",
+    "RGB": "rgb24",
+    "RGBA": "rgba",
+}
+
+end_of_stream = None
+
+
+class player(object):
+    """
+    Plays a video file on the device, reporting the number of frames decoded,
+    displayed and dropped.
+
+    :param path: The video file to play.
+    :param queue_size: The maximum number of frames held between each stage.
+    """
+    def __init__(self, device, path, queue_size=4):
+        self.device = device
+        self.clip = av.open(path)
+        self.stream = self.clip.streams.video[0]
+        self.stream.thread_type = "AUTO"
+        self.frame_period = 1.0 / float(self.stream.average_rate or 30)
+
+        self.decoded = queue.Queue(maxsize=queue_size)
+        self.scaled = queue.Queue(maxsize=queue_size)
+        self.converted = queue.Queue(maxsize=queue_size)
+
+        self.start_time = None
+        self.error = None
+        self.decoded_count = 0
+        self.displayed_count = 0
+        # Frames are dropped by both the scaling stage and play()
+        self.dropped_count = 0
+        self._dropped_lock = threading.Lock()
+
+    def lateness(self, pts):
+        """
+        How far behind schedule (in seconds) a frame with the given timestamp
+        is, or zero if playback has not started yet.
+        """
+        if self.start_time is None:
+            return 0
+        return time.monotonic() - (self.start_time + pts)
+
+    def drop(self):
+        with self._dropped_lock:
+            self.dropped_count += 1
+
+    def decode(self):
+        for index, frame in enumerate(self.clip.decode(self.stream)):
+            # Frames without a timestamp are timed by their position instead
+            pts = frame.time if frame.time is not None else index * self.frame_period
+            self.decoded_count += 1
+            self.decoded.put((pts, frame))
+
+    def scale(self):
+        width, height = self.device.size
+        pixel_format = pixel_formats.get(self.device.mode, "rgb24")
+        while True:
+            item = self.decoded.get()
+            if item is end_of_stream:
+                break
+
+            # No point scaling a frame that will be dropped anyway
+            pts, frame = item
+            if self.lateness(pts) > self.frame_period:
+                self.drop()
+                continue
+
+            # libswscale resizes and converts the pixel format in one pass
+            scaled = frame.reformat(width=width, height=height, format=pixel_format, interpolation="LANCZOS")
+            self.scaled.put((pts, scaled))
+
+    def convert(self):
+        while True:
+            item = self.scaled.get()
+            if item is end_of_stream:
+                break
+
+            pts, frame = item
+            img = frame.to_image()
+            if img.mode != self.device.mode:
+                img = img.convert(self.device.mode)
+            self.converted.put((pts, img))
+
+    def run_stage(self, stage, output):
+        """
+        Runs a stage of the pipeline, always ending its output with
+        ``end_of_stream`` (so that later stages, and :py:meth:`play`, stop
+        even if it fails) and keeping the first error raised by any stage.
+        """
+        try:
+            stage()
+        except Exception as e:
+            if self.error is None:
+                self.error = e
+        finally:
+            output.put(end_of_stream)
+
+    def play(self):
+        for stage, output in [(self.decode, self.decoded), (self.scale, self.scaled), (self.convert, self.converted)]:
+            threading.Thread(target=self.run_stage, args=(stage, output), daemon=True).start()
+
+        while True:
+            item = self.converted.get()
+            if item is end_of_stream:
+                break
+
+            pts, img = item
+            if self.start_time is None:
+                self.start_time = time.monotonic() - pts
+
+            lateness = self.lateness(pts)
+            if lateness > self.frame_period:
+                self.drop()
+                continue
+
+            if lateness < 0:
+                time.sleep(-lateness)
+
+            self.device.display(img)
+            self.displayed_count += 1
+
+        if self.error is not None:
+            raise self.error
+
+    def stats(self):
+        return f"Decoded: {self.decoded_count}, displayed: {self.displayed_count}, dropped: {self.dropped_count}"
+
+
 def main():
     video_path = str(Path(__file__).resolve().parent.joinpath('images', 'movie.mp4'))
     print(f'Loading {video_path}...')
 
-    clip = av.open(video_path)
-
-    for i, frame in enumerate(clip.decode(video=0)):
-        print(f'{i} ------')
-
-        img = frame.to_image()
-        if img.width != device.width or img.height != device.height:
-            # resize video to fit device
-            size = device.width, device.height
-            img = img.resize(size, PIL.Image.LANCZOS)
-
-        device.display(img.convert(device.mode))
+    video = player(device, video_path)
+    try:
+        video.play()
+    finally:
+        print(video.stats())
 
 
 if __name__ == "__main__":
@@ -1,19 +1,25 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
-# Copyright (c) 2014-2023 Richard Hull and contributors
+# Copyright (c) 2014-2026 Richard Hull and contributors
 # See LICENSE.rst for details.
 # PYTHON_ARGCOMPLETE_OK
 
 """
 Unicode font rendering & scrolling.
+
+The layout of each greeting (font size, line breaks and position) is worked
+out once, in the background at startup, and each greeting is then rendered
+just the once too.
 """
 
 import random
-from pathlib import Path
+import threading
 from demo_opts import get_device
-from luma.core.virtual import viewport, snapshot, range_overlap
+from font_registry import make_font
+from luma.core.virtual import snapshot, range_overlap
+from tiled_viewport import tiled_viewport
 from luma.core.sprite_system import framerate_regulator
-from PIL import ImageFont
+from PIL import Image, ImageDraw
 
 
 welcome = [
@@ -116,11 +122,6 @@ colors = [
 ]
 
 
-def make_font(name, size):
-    font_path = str(Path(__file__).resolve().parent.joinpath('fonts', name))
-    return ImageFont.truetype(font_path, size)
-
-
 def lerp_1d(start, end, n):
     delta = float(end - start) / float(n)
     for i in range(n):
@@ -158,27 +159,108 @@ def infinite_shuffle(arr):
             yield elem
 
 
-def make_snapshot(width, height, text, fonts, color="white"):
-
-    def render(draw, width, height):
-        t = text
-
-        # measure text
-        for font in fonts:
-            left, top, right, bottom = draw.multiline_textbbox((0, 0), t, font)
-            size = right - left, bottom - top
-            if size[0] > width:
-                t = text.replace(" ", "\n")
-                left, top, right, bottom = draw.multiline_textbbox((0, 0), t, font)
-                size = right - left, bottom - top
-            else:
+class text_layout(object):
+    """
+    Fits text into a box, using the largest of a range of sizes of a font at
+    which the text fits, either on one line or with a line per word, and
+    centres it. Layouts are memoised by text and box size, and the rendered
+    text is kept as a mask, so that each is only worked out and rasterised
+    once.
+
+    :param font_name: The font to use.
+    :param sizes: The sizes of the font to choose from.
+    :param spacing: The number of pixels between lines.
+    :type spacing: int
+    """
+    def __init__(self, font_name, sizes, spacing=-2):
+        self.font_name = font_name
+        self.sizes = sorted(sizes)
+        self.spacing = spacing
+        self.layouts = {}
+        self.rasters = {}
+        self._draw = ImageDraw.Draw(Image.new("L", (1, 1)))
+        # FreeType fonts can't be used from several threads at once
+        self._lock = threading.RLock()
+
+    def measure(self, text, size):
+        left, top, right, bottom = self._draw.multiline_textbbox(
+            (0, 0), text, make_font(self.font_name, size), align="center", spacing=self.spacing)
+        return right - left, bottom - top
+
+    def fit(self, text, size, width, height):
+        """
+        Returns the text, with line breaks if need be, and its size, if it
+        fits in the box at the given font size; otherwise ``None``.
+        """
+        for t in [text, text.replace(" ", "\n")]:
+            w, h = self.measure(t, size)
+            if w <= width and h <= height:
+                return t, (w, h)
+            if " " not in text:
                 break
 
-        # draw text
-        left = (width - size[0]) // 2
-        top = (height - size[1]) // 2
-        draw.multiline_text((left, top), text=t, font=font, fill=color,
-                            align="center", spacing=-2)
+    def layout(self, text, width, height):
+        """
+        Returns the font size, the text (with line breaks if need be) and its
+        position within the box.
+        """
+        key = (text, width, height)
+        with self._lock:
+            if key not in self.layouts:
+                # Binary search for the largest size that fits, assuming that
+                # text which doesn't fit at one size won't fit at any larger
+                lo, hi = 0, len(self.sizes) - 1
+                best = None
+                while lo <= hi:
+                    mid = (lo + hi) // 2
+                    fit = self.fit(text, self.sizes[mid], width, height)
+                    if fit:
+                        best = (self.sizes[mid],) + fit
+                        lo = mid + 1
+                    else:
+                        hi = mid - 1
+
+                # Too big even at the smallest size: shown cropped
+                if best is None:
+                    t = text.replace(" ", "\n")
+                    best = (self.sizes[0], t, self.measure(t, self.sizes[0]))
+
+                size, t, (w, h) = best
+                self.layouts[key] = (size, t, ((width - w) // 2, (height - h) // 2))
+            return self.layouts[key]
+
+    def raster(self, text, width, height, fontmode="L"):
+        """
+        Returns the text laid out in the box as a mask, with anti-aliasing
+        unless the font mode is "1".
+        """
+        key = (text, width, height, fontmode)
+        with self._lock:
+            if key not in self.rasters:
+                size, t, xy = self.layout(text, width, height)
+                mask = Image.new("L", (width, height))
+                draw = ImageDraw.Draw(mask)
+                draw.fontmode = fontmode
+                draw.multiline_text(xy, t, font=make_font(self.font_name, size), fill=255,
+                                    align="center", spacing=self.spacing)
+                self.rasters[key] = mask
+            return self.rasters[key]
+
+    def precompute(self, texts, width, height):
+        """
+        Works out the layouts of all of the texts on a background thread.
+        """
+        def run():
+            for text in texts:
+                self.layout(text, width, height)
+
+        threading.Thread(target=run, daemon=True).start()
+
+
+def make_snapshot(width, height, text, layout, color="white"):
+
+    def render(draw, width, height):
+        draw.bitmap((0, 0), layout.raster(text, width, height, draw.fontmode), fill=color)
 
     return snapshot(width, height, render, interval=10)
 
@@ -197,16 +279,20 @@ def overlapping(pt_a, pt_b, w, h):
 
 def main():
     regulator = framerate_regulator(fps=30)
-    fonts = [make_font("code2000.ttf", sz) for sz in range(24, 8, -2)]
+    layout = text_layout("code2000.ttf", range(24, 8, -2))
+    # Lay out the first greeting now, so that a missing font fails here
+    # rather than on a background thread
+    layout.layout(welcome[0], device.width, device.height)
+    layout.precompute(welcome, device.width, device.height)
     sq = device.width * 2
-    virtual = viewport(device, sq, sq)
+    virtual = tiled_viewport(device, sq, sq)
 
     color_gen = pairs(infinite_shuffle(colors))
 
     for welcome_a, welcome_b in pairs(infinite_shuffle(welcome)):
         color_a, color_b = next(color_gen)
-        widget_a = make_snapshot(device.width, device.height, welcome_a, fonts, color_a)
-        widget_b = make_snapshot(device.width, device.height, welcome_b, fonts, color_b)
+        widget_a = make_snapshot(device.width, device.height, welcome_a, layout, color_a)
+        widget_b = make_snapshot(device.width, device.height, welcome_b, layout, color_b)
 
         while True:
             posn_a = random_point(virtual.width - device.width, virtual.height - device.height)
@@ -8,14 +8,21 @@ Tests for the :py:mod:`demo_opts` module.
 """
 
 import sys
+import time
 from pathlib import Path
 
 from unittest.mock import patch, Mock
 import pytest
 
+import luma.core.sprite_system
 import luma.emulator.device
+from luma.core.device import dummy
+from luma.core.render import canvas
 
-from demo_opts import display_settings, get_device, cmdline
+from luma.oled.device import ssd1306
+from PIL import Image, ImageDraw
+
+from demo_opts import display_settings, get_device, cmdline, frame_profiler, dirty_tracker, pipelined_device
 
 
 test_config_file = str(Path(__file__).resolve().parent.joinpath('resources', 'config-test.txt'))
@@ -92,6 +99,204 @@ def test_get_device_unknown(capsys):
     assertInError("invalid choice: 'foo'", capsys)
 
 
+@pytest.fixture
+def uninstrumented(monkeypatch):
+    """
+    Restore the hooks installed by :py:meth:`frame_profiler.instrument`.
+    """
+    monkeypatch.setattr(canvas, '__enter__', canvas.__enter__)
+    monkeypatch.setattr(canvas, '__exit__', canvas.__exit__)
+    monkeypatch.setattr(time, 'sleep', time.sleep)
+    monkeypatch.setattr(luma.core.sprite_system, 'sleep', luma.core.sprite_system.sleep)
+    monkeypatch.setattr('atexit.register', Mock())
+    monkeypatch.setattr('signal.signal', Mock())
+
+
+def test_get_device_profile(uninstrumented):
+    """
+    Passing --profile installs the frame profiler on the device.
+    """
+    device = get_device(['--display', 'capture', '--profile'])
+
+    assert 'display' in vars(device)
+    assert time.sleep is luma.core.sprite_system.sleep
+
+
+def test_frame_profiler_phases(uninstrumented):
+    """
+    Each call to display ends a frame, with the time split into phases.
+    """
+    profiler = frame_profiler(history=2)
+    device = profiler.instrument(dummy(mode='1'))
+
+    for _ in range(3):
+        with canvas(device, dither=True) as draw:
+            draw.rectangle((10, 10, 20, 20), fill='white')
+        time.sleep(0.001)
+
+    assert profiler.frames == 3
+    assert list(profiler.samples) == ['simulate', 'draw', 'convert', 'transfer', 'sleep', 'frame']
+    assert all(len(samples) == 2 for samples in profiler.samples.values())
+    assert device.image.getpixel((15, 15)) == 255
+
+    report = profiler.report()
+    assert report.startswith('Frame profile: 3 frames, last 2 shown')
+    assert 'transfer: mean=' in report
+
+
+def test_frame_profiler_cprofile(tmpdir):
+    """
+    The cProfile stats are written out after the given number of frames.
+    """
+    output = str(tmpdir.join('frames.pstats'))
+    profiler = frame_profiler(cprofile_frames=2, cprofile_output=output)
+
+    profiler.end_frame()
+    assert not tmpdir.join('frames.pstats').exists()
+    profiler.end_frame()
+    assert tmpdir.join('frames.pstats').exists()
+
+
+class gram_interface(object):
+    """
+    Serial interface that models the display RAM of an SSD1306 in horizontal
+    addressing mode, following the column & page address window commands.
+    """
+    def __init__(self, width=128, pages=8):
+        self.gram = [[0] * width for _ in range(pages)]
+        self.window = (0, width - 1, 0, pages - 1)
+        self.bytes_sent = 0
+
+    def command(self, *cmd):
+        if cmd and cmd[0] == 0x21:
+            self.window = (cmd[1], cmd[2], cmd[4], cmd[5])
+
+    def data(self, data):
+        self.bytes_sent += len(data)
+        col_start, col_end, page_start, page_end = self.window
+        cells = [(page, col) for page in range(page_start, page_end + 1)
+                 for col in range(col_start, col_end + 1)]
+        for (page, col), value in zip(cells, data):
+            self.gram[page][col] = value
+
+    def cleanup(self):
+        pass
+
+
+def test_dirty_tracker_changed_regions():
+    """
+    The changed areas are reported per segment, and nothing for an identical
+    frame.
+    """
+    tracker = dirty_tracker(num_segments=4)
+    image = Image.new('1', (128, 64))
+    assert tracker.changed_regions(image) == [(0, 0, 128, 64)]
+
+    tracker.prev_image = image.copy()
+    assert tracker.changed_regions(image) == []
+
+    draw = ImageDraw.Draw(image)
+    draw.point((3, 4), fill='white')
+    draw.rectangle((60, 30, 70, 40), fill='white')
+    assert tracker.changed_regions(image) == [
+        (3, 4, 64, 32), (64, 30, 71, 32), (60, 32, 64, 41), (64, 32, 71, 41)]
+
+
+def test_dirty_tracker_partial_update():
+    """
+    Unchanged frames are skipped, and changed regions are sent to an SSD1306
+    leaving the display RAM as if the full frame had been sent.
+    """
+    reference = gram_interface()
+    ssd1306(reference).display(Image.new('1', (128, 64)))
+
+    serial = gram_interface()
+    tracker = dirty_tracker(num_segments=4)
+    device = tracker.instrument(ssd1306(serial))
+
+    with canvas(device) as draw:
+        draw.text((10, 10), 'Hello', fill='white')
+    bytes_sent = serial.bytes_sent
+    with canvas(device) as draw:
+        draw.text((10, 10), 'Hello', fill='white')
+    assert serial.bytes_sent == bytes_sent
+
+    image = Image.new('1', (128, 64))
+    draw = ImageDraw.Draw(image)
+    draw.text((10, 10), 'Hello', fill='white')
+    draw.ellipse((70, 20, 100, 50), outline='white')
+    device.display(image)
+    ssd1306(reference).display(image)
+
+    assert tracker.skipped == 1
+    assert tracker.partial == 1
+    assert serial.bytes_sent - bytes_sent < 128 * 8
+    assert serial.gram == reference.gram
+
+
+class slow_device(dummy):
+    """
+    Dummy device that takes a while to display each frame, and remembers
+    every frame it was sent.
+    """
+    def __init__(self, **kwargs):
+        super(slow_device, self).__init__(**kwargs)
+        self.frames = []
+
+    def display(self, image):
+        time.sleep(0.02)
+        super(slow_device, self).display(image)
+        self.frames.append(self.image)
+
+
+def test_get_device_pipeline():
+    """
+    Passing --pipeline wraps the device in a pipelined proxy.
+    """
+    device = get_device(['--display', 'capture', '--pipeline', '--pipeline-depth', '3'])
+
+    assert isinstance(device, pipelined_device)
+    assert device.max_queue == 3
+    assert device.width == 128
+
+
+def test_pipelined_device_drops_stale_frames():
+    """
+    When frames arrive faster than the device can take them, the stalest
+    queued frames are dropped, but the most recent is always displayed.
+    """
+    inner = slow_device(width=16, height=16)
+    device = pipelined_device(inner, max_queue=1)
+
+    for i in range(10):
+        with canvas(device) as draw:
+            draw.point((i, 0), fill='white')
+    device.flush()
+
+    stats = device.stats()
+    assert stats['queued'] == 10
+    assert stats['displayed'] + stats['dropped'] == 10
+    assert stats['dropped'] > 0
+    assert stats['queue_depth'] == 0
+    assert stats['max_depth'] == 1
+    assert inner.frames[-1].getpixel((9, 0)) == (255, 255, 255)
+
+
+def test_pipelined_device_clear_is_ordered():
+    """
+    Clearing the display is queued behind any pending frames.
+    """
+    inner = slow_device(width=16, height=16)
+    device = pipelined_device(inner)
+
+    with canvas(device) as draw:
+        draw.point((0, 0), fill='white')
+    device.clear()
+    device.flush()
+
+    assert inner.frames[-1].getbbox() is None
+
+
 # luma.emulator
 
 def test_get_device_emulator_all():